@@ -0,0 +1,170 @@
+import json
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+from rdflib import Dataset, Graph, Literal, Namespace, URIRef
+from rdflib.namespace import RDF
+from instrumentation import span
+
+PUB = Namespace("http://example.org/publication-ontology#")
+GRAPH_BASE = "http://example.org/publication-ontology/graph/"
+TBOX_FILE = "data/ontology/dreamteam-b1-AkosSchneider_DinaraKurmangaliyeva.ttl"
+SHARD_DIR = "data/ontology/shards"
+MANIFEST = "manifest.json"
+
+# Shard kinds, in manifest order:
+#   tbox      the ontology triples the builder loaded first
+#   relation  one shard per object property (cite, hasAuthor, hasReview, type, ...)
+#   literal   one shard per datatype property (title, abstract, name, year, ...)
+#   inferred  rdf:type triples entailed by domain/range and subclass restrictions, which the
+#             monolithic ABOX only keeps in the builder's statistics
+KINDS = ("tbox", "relation", "literal", "inferred")
+
+
+def local_name(uri):
+    return str(uri).rsplit("#", 1)[-1].rsplit("/", 1)[-1]
+
+
+def inferred_type_triples(g, tracking):
+    """rdf:type triples for the tracked domain/range and inclusion types not already asserted in g"""
+    triples = set()
+    for key in ("inferred_type_entities", "inferred_inclusion_entities"):
+        for type_name, entities in tracking[key].items():
+            for entity in entities:
+                triple = (URIRef(entity), RDF.type, PUB[type_name])
+                if triple not in g:
+                    triples.add(triple)
+    return triples
+
+
+def partition(g, tbox_file=TBOX_FILE):
+    """Split the builder's graph into {(kind, name): set of triples}"""
+    tbox = Graph()
+    if os.path.exists(tbox_file):
+        tbox.parse(tbox_file, format="turtle")
+
+    shards = defaultdict(set)
+    for triple in g:
+        if triple in tbox:
+            shards[("tbox", "tbox")].add(triple)
+        elif isinstance(triple[2], Literal):
+            shards[("literal", local_name(triple[1]))].add(triple)
+        else:
+            shards[("relation", local_name(triple[1]))].add(triple)
+    return shards
+
+
+def write_shards(g, tracking, shard_dir=SHARD_DIR, tbox_file=TBOX_FILE):
+    """Write every shard as N-Triples plus a manifest.json with names, graph IRIs and triple counts"""
+    shards = partition(g, tbox_file)
+    inferred = inferred_type_triples(g, tracking)
+    if inferred:
+        shards[("inferred", "inferred")] = inferred
+
+    os.makedirs(shard_dir, exist_ok=True)
+    manifest = {"format": "nt", "total_triples": 0, "shards": []}
+    for kind, name in sorted(shards, key=lambda key: (KINDS.index(key[0]), key[1])):
+        triples = shards[(kind, name)]
+        file_name = f"{kind}-{name}.nt" if kind in ("relation", "literal") else f"{name}.nt"
+        with span(f"shards.write:{file_name}") as stage:
+            shard = Graph()
+            for triple in triples:
+                shard.add(triple)
+            shard.serialize(destination=os.path.join(shard_dir, file_name), format="nt", encoding="utf-8")
+            stage.count("triples", len(triples))
+        manifest["shards"].append({
+            "name": name,
+            "kind": kind,
+            "graph": f"{GRAPH_BASE}{kind}/{name}",
+            "file": file_name,
+            "triples": len(triples),
+            "bytes": os.path.getsize(os.path.join(shard_dir, file_name)),
+        })
+        if kind != "inferred":
+            manifest["total_triples"] += len(triples)
+
+    with open(os.path.join(shard_dir, MANIFEST), "w", encoding="utf-8") as file:
+        json.dump(manifest, file, indent=2)
+    return manifest
+
+
+def read_manifest(shard_dir=SHARD_DIR):
+    with open(os.path.join(shard_dir, MANIFEST), encoding="utf-8") as file:
+        return json.load(file)
+
+
+def select_shards(manifest, kinds=None, names=None):
+    """Manifest entries filtered by kind and/or shard name"""
+    return [
+        shard for shard in manifest["shards"]
+        if (kinds is None or shard["kind"] in kinds) and (names is None or shard["name"] in names)
+    ]
+
+
+def _parse_shard(path):
+    shard = Graph()
+    shard.parse(path, format="nt")
+    return list(shard)
+
+
+def _entity_triples(path):
+    """(s, p, o) strings of the triples whose subject and object are IRIs, read line by line.
+
+    N-Triples puts one triple per line, so IRI-only lines split without an RDF parser; the
+    rare line with an escape sequence goes through rdflib.
+    """
+    triples = []
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            parts = line.split(" ", 2)
+            if len(parts) < 3 or not (parts[0][0] == parts[2][0] == "<"):
+                continue
+            obj = parts[2].rstrip().removesuffix(" .")
+            if "\\" in line:
+                (s, p, o), = Graph().parse(data=line, format="nt")
+                triples.append((str(s), str(p), str(o)))
+            elif obj.endswith(">") and " " not in obj:
+                triples.append((parts[0][1:-1], parts[1][1:-1], obj[1:-1]))
+    return triples
+
+
+def load_entity_triples(shard_dir=SHARD_DIR, kinds=("tbox", "relation"), jobs=1):
+    """IRI-to-IRI triples as strings from the selected shards, with jobs > 1 one process per shard"""
+    shards = select_shards(read_manifest(shard_dir), kinds)
+    paths = [os.path.join(shard_dir, shard["file"]) for shard in shards]
+    with span("shards.load_entity_triples") as stage:
+        if jobs > 1 and len(paths) > 1:
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                parsed = list(executor.map(_entity_triples, paths))
+        else:
+            parsed = [_entity_triples(path) for path in paths]
+        triples = [triple for shard in parsed for triple in shard]
+        stage.count("triples", len(triples))
+    return triples
+
+
+def load_shards(shard_dir=SHARD_DIR, kinds=None, names=None, jobs=1, named=False):
+    """Load only the selected shards, with jobs > 1 parsing them in parallel processes.
+
+    Sending the parsed terms back costs about as much as parsing, so parallel loading only
+    pays off for shards in the hundreds of MB. Returns a Graph with the union of the shards,
+    or with named=True a Dataset that keeps every shard in its own named graph.
+    """
+    shards = select_shards(read_manifest(shard_dir), kinds, names)
+    paths = [os.path.join(shard_dir, shard["file"]) for shard in shards]
+    with span("shards.load") as stage:
+        if jobs > 1 and len(paths) > 1:
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                parsed = list(executor.map(_parse_shard, paths))
+        else:
+            parsed = [_parse_shard(path) for path in paths]
+
+        g = Dataset() if named else Graph()
+        g.bind("pub", PUB)
+        for shard, triples in zip(shards, parsed):
+            target = g.graph(URIRef(shard["graph"])) if named else g
+            for triple in triples:
+                target.add(triple)
+            stage.count("triples", len(triples))
+    return g
@@ -0,0 +1,168 @@
+import csv
+import os
+import re
+import unicodedata
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from difflib import SequenceMatcher
+
+import numpy as np
+import pandas as pd
+from compressed_io import open_text, repo_path, resolve
+from instrumentation import span
+
+# === Paths and join configuration ===
+# Relative to the repository root (repo_path), for the inputs and the output alike, so
+# `cli dedup` reads and writes the same files from any working directory
+embedding_path = "data/kge/transh_50_5/entity_embeddings.npy"
+entity_map_path = "data/kge/transh_50_5/entity_to_id.csv"
+authors_path = "data/assignment1/nodes/authors.csv"
+output_path = "data/kge/dedup/author_duplicate_candidates.csv"
+
+top_k = 5            # neighbours kept per author within each block
+min_score = 0.8      # cosine similarity threshold for a candidate pair
+chunk_rows = 1024    # rows per matrix product; memory is chunk_rows x block size floats
+max_block_size = 5000  # larger blocks (very common names) are split on the first three given-name letters
+jobs = os.cpu_count() or 1
+
+
+def normalize_name(name):
+    """Lowercase ASCII tokens without accents, punctuation or DBLP homonym numbers ("Amy Zhang 0001")"""
+    ascii_name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode()
+    return [t for t in re.split(r"[^a-z0-9]+", ascii_name.lower()) if t and not t.isdigit()]
+
+
+def blocking_keys(name, prefix=1):
+    """Two keys per author, so a spelling variant in either the given name or the surname still
+    shares a block: surname + first initial, and first given name + surname initial.
+    A longer prefix gives the finer keys used to split oversized blocks."""
+    tokens = normalize_name(name)
+    if not tokens:
+        return []
+    if len(tokens) == 1:
+        return [f"{tokens[0]}|"]
+    given, surname = tokens[0], tokens[-1]
+    return sorted({f"{surname}|{given[:prefix]}", f"{given}|{surname[:prefix]}"})
+
+
+def load_authors(embedding_path=embedding_path, entity_map_path=entity_map_path, authors_path=authors_path):
+    """Author URIs, display names and L2-normalised embeddings (float32, one row per author)"""
+    embeddings = np.load(resolve(repo_path(embedding_path)))
+    entity_df = pd.read_csv(resolve(repo_path(entity_map_path)))
+    author_df = entity_df[entity_df["entity"].str.contains("#author_")].sort_values("id").reset_index(drop=True)
+
+    # Entity URIs use the cleaned CSV id (see create_uri in dreamteam-b2)
+    names = {}
+    authors_path = resolve(repo_path(authors_path))
+    if not os.path.exists(authors_path):
+        print(f"Warning: {authors_path} not found; author names are derived from their URIs")
+    else:
+        with open_text(authors_path) as file:
+            for row in csv.DictReader(file):
+                clean_id = row["id:ID"].replace("/", "_").replace(" ", "_").replace(":", "_")
+                names[clean_id] = row["name"]
+    local_ids = author_df["entity"].str.rsplit("#", n=1).str[-1]
+    author_df["name"] = [names.get(i, i.removeprefix("author_").replace("_", " ")) for i in local_ids]
+
+    vectors = embeddings[author_df["id"].values].astype(np.float32)
+    vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    return author_df, vectors
+
+
+def build_blocks(names, max_block_size=max_block_size):
+    """Map blocking key -> author row indexes, dropping blocks with a single author"""
+    names = list(names)
+    blocks = defaultdict(list)
+    for row, name in enumerate(names):
+        for key in blocking_keys(name):
+            blocks[key].append(row)
+
+    # Re-key the members of oversized blocks with three-letter prefixes; the cost of a block
+    # grows with its size squared, so a handful of very common names would dominate the join
+    for key in [k for k, rows in blocks.items() if len(rows) > max_block_size]:
+        for row in blocks.pop(key):
+            for fine_key in blocking_keys(names[row], prefix=3):
+                if fine_key.split("|")[0] == key.split("|")[0]:
+                    blocks[fine_key].append(row)
+    return {key: np.array(sorted(set(rows))) for key, rows in blocks.items() if len(rows) > 1}
+
+
+def join_block(key, rows, vectors, top_k=top_k, min_score=min_score, chunk_rows=chunk_rows):
+    """Top-k cosine neighbours within one block, computed chunk by chunk with matrix products"""
+    block = vectors[rows]
+    k = min(top_k, len(rows) - 1)
+    pairs = []
+    for start in range(0, len(rows), chunk_rows):
+        scores = block[start:start + chunk_rows] @ block.T
+        local = np.arange(start, start + len(scores))
+        scores[np.arange(len(scores)), local] = -np.inf  # no self-pairs
+        best = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        best_scores = np.take_along_axis(scores, best, axis=1)
+        keep = best_scores >= min_score
+        for i, j, score in zip(np.repeat(local, k)[keep.ravel()], best[keep], best_scores[keep]):
+            a, b = sorted((rows[i], rows[j]))
+            pairs.append((a, b, float(score), key))
+    return pairs
+
+
+def similarity_join(vectors, blocks, top_k=top_k, min_score=min_score, chunk_rows=chunk_rows, jobs=jobs):
+    """Candidate pairs (row a, row b, score, first block key) over all blocks.
+
+    Only authors sharing a blocking key are compared, so the cost is the sum of squared block
+    sizes rather than n^2. Blocks run on a thread pool; numpy releases the GIL inside BLAS.
+    """
+    candidates = {}
+    # Largest blocks first so one big block does not end up last on a single thread
+    ordered = sorted(blocks.items(), key=lambda item: -len(item[1]))
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = [
+            executor.submit(join_block, key, rows, vectors, top_k, min_score, chunk_rows)
+            for key, rows in ordered
+        ]
+        for future in futures:
+            for a, b, score, key in future.result():
+                if (a, b) not in candidates:
+                    candidates[(a, b)] = (score, key)
+    return [(a, b, score, key) for (a, b), (score, key) in candidates.items()]
+
+
+def main(output_path=output_path, min_score=min_score, top_k=top_k, jobs=jobs):
+    with span("dedup.load") as stage:
+        author_df, vectors = load_authors()
+        stage.count("authors", len(author_df))
+
+    with span("dedup.block") as stage:
+        blocks = build_blocks(author_df["name"])
+        comparisons = sum(len(rows) * (len(rows) - 1) for rows in blocks.values())
+        stage.count("blocks", len(blocks))
+        stage.count("comparisons", comparisons)
+    print(f"{len(author_df)} authors in {len(blocks)} blocks, {comparisons} comparisons "
+          f"instead of {len(author_df) * (len(author_df) - 1)} for all pairs")
+
+    with span("dedup.join") as stage:
+        pairs = similarity_join(vectors, blocks, top_k, min_score, jobs=jobs)
+        stage.count("comparisons", comparisons)
+
+    names, entities = author_df["name"].values, author_df["entity"].values
+    result = pd.DataFrame([
+        {
+            "author_a": entities[a],
+            "author_b": entities[b],
+            "name_a": names[a],
+            "name_b": names[b],
+            "score": round(score, 4),
+            "name_similarity": round(SequenceMatcher(None, names[a].lower(), names[b].lower()).ratio(), 4),
+            "block": key,
+        }
+        for a, b, score, key in pairs
+    ], columns=["author_a", "author_b", "name_a", "name_b", "score", "name_similarity", "block"])
+    result = result.sort_values("score", ascending=False)
+
+    output_path = repo_path(output_path)
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    result.to_csv(output_path, index=False)
+    print(f"Saved {len(result)} candidate duplicate pairs (cosine >= {min_score}) to {output_path}")
+
+
+if __name__ == "__main__":
+    main()
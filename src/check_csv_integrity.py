@@ -0,0 +1,161 @@
+import csv
+import os
+import sys
+from collections import Counter
+
+import numpy as np
+from instrumentation import span
+from compressed_io import glob_data, open_text, resolve, strip_compression
+
+DATA_DIR = "data/assignment1"
+
+# Which node file(s) the ABOX builder assumes each endpoint refers to. An id that exists in a
+# different node file is still wrong for the builder: it is minted under the expected prefix
+# (e.g. a pub_... id becomes paper_pub_...) and ends up as an untyped node.
+RELATIONSHIP_ENDPOINTS = {
+    "write_rel.csv": (["authors"], ["research_papers"]),
+    "is_about_rel.csv": (["research_papers"], ["topics"]),
+    "cite_rel.csv": (["research_papers"], ["research_papers"]),
+    "published_in_rel.csv": (["research_papers"], ["publisher_places", "volumes"]),
+    "reviews_rel.csv": (["authors"], ["research_papers"]),
+    "contain_rel.csv": (["publisher_places"], ["volumes"]),
+    "has_rel.csv": (["publisher_places"], ["proceedings"]),
+    "publish_rel.csv": (["research_papers"], ["research_publications"]),
+}
+CHUNK_ROWS = 100_000
+SAMPLE_SIZE = 5
+
+
+def stream_columns(path, columns, chunk_rows=CHUNK_ROWS):
+    """Yield lists of the given columns' values, `chunk_rows` rows at a time"""
+    with open_text(resolve(path)) as file:
+        reader = csv.reader(file)
+        header = next(reader, [])
+        missing = [c for c in columns if c not in header]
+        if missing:
+            raise ValueError(f"{path} has no column(s) {', '.join(missing)}")
+        indexes = [header.index(c) for c in columns]
+        chunk = [[] for _ in columns]
+        for row in reader:
+            for values, index in zip(chunk, indexes):
+                values.append(row[index])
+            if len(chunk[0]) >= chunk_rows:
+                yield chunk
+                chunk = [[] for _ in columns]
+        if chunk[0]:
+            yield chunk
+
+
+def hash_ids(values):
+    """64-bit hashes of id strings; collisions are negligible at millions of ids (~n^2 / 2^64)"""
+    return np.fromiter(map(hash, values), dtype=np.int64, count=len(values))
+
+
+def contains(sorted_hashes, hashes):
+    """Vectorised membership test against a sorted hash array"""
+    if len(sorted_hashes) == 0:
+        return np.zeros(len(hashes), dtype=bool)
+    positions = np.searchsorted(sorted_hashes, hashes)
+    positions[positions == len(sorted_hashes)] = 0
+    return sorted_hashes[positions] == hashes
+
+
+def load_node_ids(data_dir=DATA_DIR):
+    """Hash every node file's id:ID column into a sorted array (8 bytes per id instead of a string set)"""
+    node_ids = {}
+    for path in glob_data(f"{data_dir}/nodes/*.csv"):
+        name = os.path.splitext(os.path.basename(strip_compression(path)))[0]
+        with span(f"integrity.nodes:{name}") as stage:
+            chunks = [hash_ids(ids) for (ids,) in stream_columns(path, ["id:ID"])]
+            hashes = np.concatenate(chunks) if chunks else np.empty(0, dtype=np.int64)
+            node_ids[name] = np.unique(hashes)
+            stage.count("rows", len(hashes))
+    return node_ids
+
+
+def check_relationship_file(path, node_ids, endpoints=None, sample_size=SAMPLE_SIZE):
+    """Check :START_ID/:END_ID of one relationship file in a single pass.
+
+    Returns one result per endpoint: rows checked, the expected node files, the dangling count
+    (id in no node file), counts of ids found in a different node file, and a few samples.
+    """
+    columns = [":START_ID", ":END_ID"]
+    all_ids = np.unique(np.concatenate(list(node_ids.values())))
+    results = []
+    for column, expected in zip(columns, endpoints or (None, None)):
+        expected_ids = np.unique(np.concatenate([node_ids[n] for n in expected])) if expected else all_ids
+        results.append({
+            "column": column,
+            "expected": expected or ["any node file"],
+            "rows": 0,
+            "dangling": 0,
+            "wrong_file": Counter(),
+            "samples": [],
+            "_expected_ids": expected_ids,
+        })
+
+    for chunk in stream_columns(path, columns):
+        for result, values in zip(results, chunk):
+            hashes = hash_ids(values)
+            result["rows"] += len(hashes)
+            bad = ~contains(result["_expected_ids"], hashes)
+            if not bad.any():
+                continue
+            bad_hashes = hashes[bad]
+            known = contains(all_ids, bad_hashes)
+            result["dangling"] += int((~known).sum())
+            for name, ids in node_ids.items():
+                found = int(contains(ids, bad_hashes[known]).sum())
+                if found:
+                    result["wrong_file"][name] += found
+            for index in np.flatnonzero(bad):
+                if len(result["samples"]) >= sample_size:
+                    break
+                if values[index] not in result["samples"]:
+                    result["samples"].append(values[index])
+
+    for result in results:
+        del result["_expected_ids"]
+    return results
+
+
+def check_integrity(data_dir=DATA_DIR, endpoints=RELATIONSHIP_ENDPOINTS, sample_size=SAMPLE_SIZE):
+    """Check every relationship file against the node files; returns {file name: endpoint results}"""
+    node_ids = load_node_ids(data_dir)
+    report = {}
+    for path in glob_data(f"{data_dir}/relationships/*.csv"):
+        name = os.path.basename(strip_compression(path))
+        with span(f"integrity.relationships:{name}") as stage:
+            report[name] = check_relationship_file(path, node_ids, endpoints.get(name), sample_size)
+            stage.count("rows", report[name][0]["rows"])
+    return report
+
+
+def print_report(report):
+    print("=== CSV Referential Integrity ===\n")
+    violations = 0
+    for name, results in report.items():
+        for result in results:
+            wrong = sum(result["wrong_file"].values())
+            violations += result["dangling"] + wrong
+            status = "ok" if result["dangling"] + wrong == 0 else "VIOLATIONS"
+            print(f"{name} {result['column']} -> {' | '.join(result['expected'])}: "
+                  f"{result['rows']} rows, {status}")
+            if result["dangling"]:
+                print(f"   - dangling (in no node file): {result['dangling']}")
+            for other, count in result["wrong_file"].most_common():
+                print(f"   - found in {other}.csv instead: {count}")
+            if result["samples"]:
+                print(f"   - samples: {', '.join(result['samples'])}")
+    print(f"\nTotal violating references: {violations}")
+    return violations
+
+
+def main(data_dir=DATA_DIR, strict=False):
+    violations = print_report(check_integrity(data_dir))
+    if strict and violations:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main(strict="--strict" in sys.argv[1:])
@@ -0,0 +1,356 @@
+import argparse
+import importlib
+import os
+import sys
+
+# One entry point for all stages: `python src/cli.py <command>`. Every command imports
+# only the module it needs, and those modules import rdflib/pandas/torch/pykeen inside
+# the functions that use them, so `--help` and `stats` start in roughly the time of a
+# bare interpreter instead of the several seconds a pykeen import takes.
+MODULES = {
+    "tbox": "dreamteam-b1-AkosSchneider_DinaraKurmangaliyeva",
+    "abox": "dreamteam-b2-AkosSchneider_DinaraKurmangaliyeva",
+    "validate": "validate_abox",
+    "check-csv": "check_csv_integrity",
+    "split": "dreamteam-c1-AkosSchneider_DinaraKurmangaliyeva",
+    "predict": "dreamteam-c2-AkosSchneider_DinaraKurmangaliyeva",
+    "sweep": "dreamteam-c3-AkosSchneider_DinaraKurmangaliyeva",
+    "cluster": "dreamteam-c4-AkosSchneider_DinaraKurmangaliyeva",
+    "train": "entity_embeddings",
+    "update": "incremental_embeddings",
+    "dedup": "author_dedup",
+    "conflicts": "review_conflicts",
+    "reviewers": "reviewer_recommender",
+    "precision-check": "training_runtime",
+    "years": "temporal_index",
+    "index": "text_index",
+    "search": "text_index",
+    "ego-index": "ego_network",
+    "ego": "ego_network",
+    "pipeline": "run_pipeline",
+}
+
+STATS_PATHS = [
+    "data/assignment1/nodes/*.csv",
+    "data/assignment1/relationships/*.csv",
+    "data/ontology/*.ttl",
+    "data/ontology/*.rdfsnap",
+    "data/kge/*.tsv",
+    "data/kge/transh_50_5/*",
+    "data/search/text_index/*",
+    "data/search/ego_index/*",
+]
+
+
+def load(command):
+    """Import the module behind a command (the stage scripts have hyphenated names)"""
+    return importlib.import_module(MODULES[command])
+
+
+def cmd_tbox(args):
+    load("tbox").main(args.output)
+
+
+def cmd_abox(args):
+    load("abox").main(args.output, args.snapshot, args.shards)
+
+
+def cmd_validate(args):
+    load("validate").main(args.abox)
+
+
+def cmd_check_csv(args):
+    load("check-csv").main(args.data_dir, args.strict)
+
+
+def cmd_split(args):
+    module = load("split")
+    all_triples_path = module.export_triples(args.abox, args.output_dir, args.compress)
+    if args.split_year is not None:
+        module.temporal_split_triples(all_triples_path, args.abox, args.output_dir, args.split_year, args.compress)
+    elif args.stratified:
+        ratios = (args.ratio, args.valid_ratio, 1 - args.ratio - args.valid_ratio)
+        module.stratified_split_triples(all_triples_path, args.output_dir, ratios, args.compress)
+    else:
+        module.split_triples(all_triples_path, args.output_dir, args.ratio, args.compress)
+
+
+def cmd_train(args):
+    module = load("train")
+    result = module.train_embeddings(use_ontology_sampler=args.ontology_sampler, num_workers=args.workers,
+                                     threads_per_worker=args.threads, batch_size=args.batch_size,
+                                     checkpoint_minutes=args.checkpoint_minutes)
+    module.export_embeddings(result, args.output_dir, args.compress)
+
+
+def cmd_sweep(args):
+    load("sweep").main(args.output)
+
+
+def cmd_cluster(args):
+    load("cluster").main(args.k, args.output_dir, args.projection, args.density)
+
+
+def cmd_predict(args):
+    load("predict").main(args.paper, use_ontology_sampler=args.ontology_sampler, num_workers=args.workers,
+                         threads_per_worker=args.threads, batch_size=args.batch_size,
+                         checkpoint_minutes=args.checkpoint_minutes)
+
+
+def cmd_update(args):
+    load("update").update_embeddings(model_dir=args.model_dir, num_epochs=args.epochs)
+
+
+def cmd_dedup(args):
+    load("dedup").main(args.output, args.min_score, args.top_k, args.jobs)
+
+
+def cmd_conflicts(args):
+    load("conflicts").main(args.data_dir, args.output, args.triples)
+
+
+def cmd_reviewers(args):
+    load("reviewers").main(args.abox, args.output, args.top_k, args.max_load)
+
+
+def cmd_precision_check(args):
+    rows, ok = load("precision-check").compare_precision(
+        model=args.model, embedding_dim=args.dim, num_epochs=args.epochs, tolerance=args.tolerance
+    )
+    print(f"{'precision':<10} {'train s':>8} {'triples/s':>10} {'eval s':>8} {'MRR':>8}")
+    for row in rows:
+        print(f"{row['precision']:<10} {row['train_seconds']:>8} {row['triples_per_second']:>10} "
+              f"{row['evaluate_seconds']:>8} {row['MRR']:>8.4f}")
+    print(f"MRR difference {'within' if ok else 'OUTSIDE'} tolerance {args.tolerance}")
+    sys.exit(0 if ok else 1)
+
+
+def cmd_years(args):
+    load("years").main(args.abox, args.start, args.end)
+
+
+def cmd_index(args):
+    load("index").main(args.abox, args.index_dir, args.full)
+
+
+def cmd_search(args):
+    import time
+
+    start = time.perf_counter()
+    index = load("search").TextIndex(args.index_dir)
+    loaded = time.perf_counter()
+    hits = index.search(" ".join(args.query), args.k)
+    for uri, score in hits:
+        print(f"{score:8.3f}  {uri}")
+    print(f"{len(hits)} hits, index opened in {(loaded - start) * 1000:.1f}ms, "
+          f"query in {(time.perf_counter() - loaded) * 1000:.1f}ms")
+
+
+def cmd_ego_index(args):
+    load("ego-index").main(args.abox, args.index_dir)
+
+
+def cmd_ego(args):
+    import json
+    import time
+
+    start = time.perf_counter()
+    index = load("ego").EgoIndex(args.index_dir)
+    loaded = time.perf_counter()
+    network = index.ego(args.entity, args.hops, args.relation, args.direction, args.max_fanout)
+    queried = time.perf_counter()
+    print(json.dumps(network.to_json(), indent=2) if args.format == "json" else network.to_turtle())
+    print(f"{len(network.nodes)} nodes, {len(network.edges)} edges, index opened in {(loaded - start) * 1000:.1f}ms, "
+          f"query in {(queried - loaded) * 1000:.1f}ms", file=sys.stderr)
+
+
+def cmd_pipeline(args):
+    ok = load("pipeline").run_pipeline(args.targets, set(args.force), args.jobs, args.dry_run)
+    sys.exit(0 if ok else 1)
+
+
+def cmd_stats(args):
+    """Row counts and sizes (on disk) of the data files, without importing any data library"""
+    from compressed_io import glob_data, open_binary, strip_compression
+
+    print(f"{'file':<70} {'rows':>10} {'size':>10}")
+    for pattern in STATS_PATHS:
+        for path in glob_data(pattern):
+            if not os.path.isfile(path):
+                continue
+            size = os.path.getsize(path)
+            rows = ""
+            if strip_compression(path).endswith((".csv", ".tsv")):
+                with open_binary(path) as file:
+                    rows = sum(1 for _ in file)
+                if strip_compression(path).endswith(".csv"):
+                    rows -= 1  # header
+                rows = f"{rows:,}"
+            print(f"{path:<70} {rows:>10} {size / (1024 * 1024):>8.1f}MB")
+
+
+def add_training_arguments(command):
+    command.add_argument("--ontology-sampler", action="store_true", help="draw negatives from domain/range pools")
+    command.add_argument("--workers", type=int, default=1, help="Data-parallel training processes (1 = plain PyKEEN pipeline)")
+    command.add_argument("--threads", type=int, default=1, help="torch threads per worker process")
+    command.add_argument("--batch-size", type=int, help="training batch size (PyKEEN default if omitted)")
+    command.add_argument("--checkpoint-minutes", type=int, default=5,
+                         help="minutes between resumable checkpoints (0 = no checkpoints)")
+
+
+def add_compress_argument(command):
+    command.add_argument("--compress", choices=["gz", "zst"],
+                         help="write the outputs compressed (readers pick up .gz/.zst files automatically)")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cli.py", description="Knowledge graph construction, embedding and clustering stages.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    command = commands.add_parser("tbox", help="build the TBOX ontology")
+    command.add_argument("--output", default="data/ontology/dreamteam-b1-AkosSchneider_DinaraKurmangaliyeva.ttl")
+    command.set_defaults(func=cmd_tbox)
+
+    command = commands.add_parser("abox", help="build the ABOX from the CSV exports")
+    command.add_argument("--output", default="data/ontology/dreamteam-b2-AkosSchneider_DinaraKurmangaliyeva.ttl")
+    command.add_argument("--snapshot", help="also write a binary .rdfsnap snapshot to this path")
+    command.add_argument("--shards", help="also write per-relation N-Triples shards and a manifest to this directory")
+    command.set_defaults(func=cmd_abox)
+
+    command = commands.add_parser("validate", help="check the ABOX against the TBOX")
+    command.add_argument("--abox", default="data/ontology/dreamteam-b2-AkosSchneider_DinaraKurmangaliyeva.ttl",
+                         help="Turtle file or .rdfsnap snapshot")
+    command.set_defaults(func=cmd_validate)
+
+    command = commands.add_parser("check-csv", help="check relationship ids in the input CSVs against the node files")
+    command.add_argument("--data-dir", default="data/assignment1")
+    command.add_argument("--strict", action="store_true", help="exit with status 1 on any violation")
+    command.set_defaults(func=cmd_check_csv)
+
+    command = commands.add_parser("split", help="export entity triples and split them into train/valid/test")
+    command.add_argument("--abox", default="data/ontology/dreamteam-b2-AkosSchneider_DinaraKurmangaliyeva.ttl",
+                         help="Turtle file, .rdfsnap snapshot or shard directory")
+    command.add_argument("--output-dir", default="data/kge")
+    command.add_argument("--ratio", type=float, default=0.8, help="training fraction")
+    command.add_argument("--split-year", type=int,
+                         help="time-respecting split: train before this year, test from it on (ignores --ratio)")
+    command.add_argument("--stratified", action=argparse.BooleanOptionalAction, default=True,
+                         help="streaming train/valid/test split per relation that keeps coupled triples together "
+                              "(default); --no-stratified uses PyKEEN's train/test split")
+    command.add_argument("--valid-ratio", type=float, default=0.1, help="validation fraction with --stratified")
+    add_compress_argument(command)
+    command.set_defaults(func=cmd_split)
+
+    command = commands.add_parser("train", help="train the TransH embeddings and export them")
+    command.add_argument("--output-dir", default="data/kge/transh_50_5")
+    add_training_arguments(command)
+    add_compress_argument(command)
+    command.set_defaults(func=cmd_train)
+
+    command = commands.add_parser("sweep", help="compare the KGE model configurations")
+    command.add_argument("--output", default="data/kge/kge_model_comparison.csv")
+    command.set_defaults(func=cmd_sweep)
+
+    command = commands.add_parser("cluster", help="cluster the author embeddings")
+    command.add_argument("-k", type=int, default=4, help="number of clusters")
+    command.add_argument("--output-dir", default="data/kge/clustering/authors")
+    command.add_argument("--projection", choices=["ipca", "random"], default="ipca",
+                         help="IncrementalPCA or a random projection for the 2-D plot")
+    command.add_argument("--density", action="store_true", default=None,
+                         help="draw a density raster even below the scatter-plot size limit")
+    command.set_defaults(func=cmd_cluster)
+
+    command = commands.add_parser("predict", help="TransE cite/hasAuthor prediction for one paper")
+    command.add_argument("--paper", default="http://example.org/publication-ontology#paper_conf_rlc_CramerFST24")
+    add_training_arguments(command)
+    command.set_defaults(func=cmd_predict)
+
+    command = commands.add_parser("update", help="fine-tune the saved embeddings on newly ingested triples")
+    command.add_argument("--model-dir", default="data/kge/transh_50_5")
+    command.add_argument("--epochs", type=int, default=10)
+    command.set_defaults(func=cmd_update)
+
+    command = commands.add_parser("dedup", help="candidate duplicate authors from a blocked embedding similarity join")
+    command.add_argument("--output", default="data/kge/dedup/author_duplicate_candidates.csv")
+    command.add_argument("--min-score", type=float, default=0.8, help="cosine similarity threshold")
+    command.add_argument("--top-k", type=int, default=5, help="neighbours kept per author and block")
+    command.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+    command.set_defaults(func=cmd_dedup)
+
+    command = commands.add_parser("conflicts", help="flag reviewers who are or co-authored with an author of the paper")
+    command.add_argument("--data-dir", default="data/assignment1")
+    command.add_argument("--output", default="data/reviews/review_conflicts.csv")
+    command.add_argument("--triples", help="also write the flags as hasConflictingReviewer N-Triples to this file")
+    command.set_defaults(func=cmd_conflicts)
+
+    command = commands.add_parser("reviewers", help="batch reviewer recommendations for all unreviewed papers")
+    command.add_argument("--abox", default="data/ontology/dreamteam-b2-AkosSchneider_DinaraKurmangaliyeva.ttl",
+                         help="Turtle file or .rdfsnap snapshot")
+    command.add_argument("--output", default="data/reviews/reviewer_recommendations.csv")
+    command.add_argument("--top-k", type=int, default=3, help="reviewers per paper")
+    command.add_argument("--max-load", type=int, default=5, help="reviews per reviewer, existing ones included")
+    command.set_defaults(func=cmd_reviewers)
+
+    command = commands.add_parser("precision-check", help="compare float32 and bfloat16 training speed and MRR")
+    command.add_argument("--model", default="TransH")
+    command.add_argument("--dim", type=int, default=50)
+    command.add_argument("--epochs", type=int, default=10)
+    command.add_argument("--tolerance", type=float, default=0.01, help="largest accepted MRR difference")
+    command.set_defaults(func=cmd_precision_check)
+
+    command = commands.add_parser("years", help="dated entities per year from the year index")
+    command.add_argument("--abox", default="data/ontology/dreamteam-b2-AkosSchneider_DinaraKurmangaliyeva.ttl",
+                         help="Turtle file, .rdfsnap snapshot or shard directory")
+    command.add_argument("--from", dest="start", type=int)
+    command.add_argument("--to", dest="end", type=int)
+    command.set_defaults(func=cmd_years)
+
+    command = commands.add_parser("index", help="build or incrementally update the BM25 full-text index")
+    command.add_argument("--abox", default="data/ontology/dreamteam-b2-AkosSchneider_DinaraKurmangaliyeva.ttl",
+                         help="Turtle file or .rdfsnap snapshot")
+    command.add_argument("--index-dir", default="data/search/text_index")
+    command.add_argument("--full", action="store_true", help="rebuild from scratch instead of reusing unchanged documents")
+    command.set_defaults(func=cmd_index)
+
+    command = commands.add_parser("search", help="top-k papers, authors and topics for a free-text query")
+    command.add_argument("query", nargs="+")
+    command.add_argument("-k", type=int, default=10, help="number of results")
+    command.add_argument("--index-dir", default="data/search/text_index")
+    command.set_defaults(func=cmd_search)
+
+    command = commands.add_parser("ego-index", help="build the adjacency index for k-hop neighbourhood queries")
+    command.add_argument("--abox", default="data/ontology/dreamteam-b2-AkosSchneider_DinaraKurmangaliyeva.ttl",
+                         help="Turtle file, .rdfsnap snapshot or shard directory")
+    command.add_argument("--index-dir", default="data/search/ego_index")
+    command.set_defaults(func=cmd_ego_index)
+
+    command = commands.add_parser("ego", help="k-hop neighbourhood of an entity as Turtle or JSON")
+    command.add_argument("entity", help="full URI or pub: local name, e.g. paper_conf_rlc_CramerFST24")
+    command.add_argument("--hops", type=int, default=2)
+    command.add_argument("--relation", action="append", help="follow only this relation (repeatable)")
+    command.add_argument("--direction", choices=["out", "in", "both"], default="both")
+    command.add_argument("--max-fanout", type=int, default=50, help="edges per node and relation on each hop (0 = no cap)")
+    command.add_argument("--format", choices=["turtle", "json"], default="turtle")
+    command.add_argument("--index-dir", default="data/search/ego_index")
+    command.set_defaults(func=cmd_ego)
+
+    command = commands.add_parser("stats", help="row counts and sizes of the data files")
+    command.set_defaults(func=cmd_stats)
+
+    command = commands.add_parser("pipeline", help="run the stale stages of the whole chain")
+    command.add_argument("targets", nargs="*")
+    command.add_argument("--force", action="append", default=[], metavar="STAGE",
+                         help="stage to rerun even if up to date (repeatable)")
+    command.add_argument("--jobs", type=int, default=2)
+    command.add_argument("--dry-run", action="store_true")
+    command.set_defaults(func=cmd_pipeline)
+
+    return parser
+
+
+if __name__ == "__main__":
+    args = build_parser().parse_args()
+    from instrumentation import span
+
+    with span(f"cli.{args.command}"):
+        args.func(args)
@@ -0,0 +1,231 @@
+import glob
+import gzip
+import io
+import os
+import queue
+import shutil
+import subprocess
+import threading
+
+# Transparent gzip/zstd reading and writing for the CSV, TSV and Turtle files of the pipeline.
+#
+# Every reader goes through resolve(): a script that asks for data/kge/train.tsv gets
+# train.tsv.gz or train.tsv.zst when only the compressed file exists, so compressed exports
+# need no staging step. Decompression runs next to the parser instead of in front of it: through
+# pigz/zstd subprocesses when they are installed (separate processes, multi-threaded), otherwise
+# in a reader thread that decompresses ahead of the consumer (zlib and zstandard release the GIL).
+# zstd in-process support needs the optional `zstandard` package.
+
+EXTENSIONS = {".gz": "gzip", ".zst": "zstd"}
+THREADS = os.cpu_count() or 1
+CHUNK_SIZE = 1 << 20
+READ_AHEAD = 8  # decompressed chunks buffered by the reader thread
+GZIP_LEVEL = 6
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def compression_of(path):
+    """"gzip", "zstd" or None from the file extension"""
+    return EXTENSIONS.get(os.path.splitext(str(path))[1])
+
+
+def resolve(path):
+    """path itself if it exists, else its first existing compressed variant, else path unchanged"""
+    if os.path.exists(path) or compression_of(path):
+        return path
+    for extension in EXTENSIONS:
+        if os.path.exists(path + extension):
+            return path + extension
+    return path
+
+
+def repo_path(path):
+    """A relative path anchored at the repository root instead of the working directory"""
+    return path if os.path.isabs(path) else os.path.join(REPO_ROOT, path)
+
+
+def strip_compression(path):
+    """path without a .gz/.zst extension"""
+    return os.path.splitext(path)[0] if compression_of(path) else path
+
+
+def glob_data(pattern):
+    """Sorted matches of pattern and of its compressed variants (nodes/*.csv also finds *.csv.gz)"""
+    paths = glob.glob(pattern)
+    for extension in EXTENSIONS:
+        paths.extend(glob.glob(pattern + extension))
+    return sorted(paths)
+
+
+def with_compression(path, compression=None):
+    """path with the extension for `compression` ("gz", "gzip", "zst", "zstd" or None) appended"""
+    if not compression:
+        return path
+    extension = {"gz": ".gz", "gzip": ".gz", "zst": ".zst", "zstd": ".zst"}[compression]
+    return path if path.endswith(extension) else path + extension
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError as error:
+        raise ImportError("Reading or writing .zst files needs the zstd binary or `pip install zstandard`") from error
+    return zstandard
+
+
+class _ProcessStream(io.RawIOBase):
+    """Binary stream over a (de)compressor subprocess; closing waits for it and checks the exit code"""
+
+    def __init__(self, process, stream, writable):
+        self._process = process
+        self._stream = stream
+        self._writable = writable
+
+    def readable(self):
+        return not self._writable
+
+    def writable(self):
+        return self._writable
+
+    def readinto(self, buffer):
+        data = self._stream.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def write(self, data):
+        self._stream.write(data)
+        return len(data)
+
+    def close(self):
+        if self.closed:
+            return
+        self._stream.close()
+        if self._process.wait() != 0:
+            raise OSError(f"{self._process.args[0]} exited with status {self._process.returncode}")
+        super().close()
+
+
+class _ReadAheadStream(io.RawIOBase):
+    """Binary stream fed by a thread that decompresses up to READ_AHEAD chunks in advance"""
+
+    def __init__(self, raw):
+        self._raw = raw
+        self._queue = queue.Queue(maxsize=READ_AHEAD)
+        self._pending = b""
+        self._done = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._fill, daemon=True)
+        self._thread.start()
+
+    def _fill(self):
+        try:
+            while not self._stop.is_set():
+                chunk = self._raw.read(CHUNK_SIZE)
+                self._put(chunk)
+                if not chunk:
+                    break
+        except Exception as error:  # re-raised in the consumer
+            self._put(error)
+
+    def _put(self, item):
+        """Queue item, giving up once close() has stopped the consumer"""
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self._pending and not self._done:
+            item = self._queue.get()
+            if isinstance(item, Exception):
+                raise item
+            self._pending = item
+            self._done = not item
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+    def close(self):
+        """Stop the reader thread, then close the decompressor it reads from"""
+        if self.closed:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._raw.close()
+        super().close()
+
+
+def _command(compression, writing, threads):
+    """pigz/zstd command line for the codec, or None if the binary is not installed"""
+    if compression == "gzip" and shutil.which("pigz"):
+        return ["pigz", "-p", str(threads), f"-{GZIP_LEVEL}", "-c"] if writing else ["pigz", "-p", str(threads), "-dc"]
+    if compression == "zstd" and shutil.which("zstd"):
+        return ["zstd", "-q", f"-T{threads}", "-c" if writing else "-dc"]
+    return None
+
+
+def open_binary(path, mode="rb", threads=THREADS):
+    """Binary file object for reading ("rb"), writing ("wb") or appending ("ab") a plain, .gz or
+    .zst file. Appending adds a new gzip member / zstd frame, which decompresses as a continuation."""
+    compression = compression_of(path)
+    writing = mode[0] in "wa"
+    file_mode = mode[0] + "b"
+    if compression is None:
+        return open(path, file_mode)
+
+    command = _command(compression, writing, threads)
+    if command:
+        with open(path, file_mode) as file:  # the child keeps its own descriptor
+            if writing:
+                process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=file)
+                return io.BufferedWriter(_ProcessStream(process, process.stdin, True))
+            process = subprocess.Popen(command, stdin=file, stdout=subprocess.PIPE)
+            return io.BufferedReader(_ProcessStream(process, process.stdout, False))
+
+    if compression == "gzip":
+        if writing:
+            return gzip.open(path, file_mode, compresslevel=GZIP_LEVEL)
+        raw = gzip.open(path, "rb")
+    else:
+        zstandard = _zstandard()
+        if writing:
+            return zstandard.ZstdCompressor(threads=-1 if threads > 1 else 0).stream_writer(open(path, file_mode))
+        raw = zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+    return io.BufferedReader(_ReadAheadStream(raw))
+
+
+def open_text(path, mode="r", threads=THREADS, encoding="utf-8", newline=""):
+    """Text file object over open_binary; mode "r", "w" or "a" """
+    binary = open_binary(path, mode[0] + "b", threads)
+    return io.TextIOWrapper(binary, encoding=encoding, newline=newline)
+
+
+def read_tsv(path):
+    """Headerless tab-separated (head, relation, tail) labels as a string array; plain or compressed"""
+    import pandas as pd
+
+    with open_text(resolve(path)) as file:
+        return pd.read_csv(file, sep="\t", header=None, dtype=str, keep_default_na=False).values
+
+
+def write_tsv(rows, path, mode="w"):
+    """Write (or with mode="a" append) rows as headerless TSV; the extension of path picks the compression"""
+    import pandas as pd
+
+    with open_text(path, mode) as file:
+        pd.DataFrame(rows).to_csv(file, sep="\t", index=False, header=False)
+    return path
+
+
+def triples_factory(path, **kwargs):
+    """TriplesFactory over a plain or compressed TSV (TriplesFactory.from_path only reads plain files);
+    kwargs such as entity_to_id/relation_to_id go to from_labeled_triples"""
+    from pykeen.triples import TriplesFactory
+
+    return TriplesFactory.from_labeled_triples(read_tsv(path), **kwargs)
@@ -1,45 +1,152 @@
 import os
-from rdflib import Graph, URIRef, Literal
-import pandas as pd
-from pykeen.triples import TriplesFactory
-
-# === Step 1: Load RDF graph ===
-abox_path = "data/ontology/dreamteam-b2-AkosSchneider_DinaraKurmangaliyeva.ttl"
-print(f"Loading RDF graph from {abox_path}...")
-g = Graph()
-g.parse(abox_path, format="turtle")
-
-# === Step 2: Filter triples ===
-print("Extracting subject-predicate-object triples (excluding literals)...")
-triples = [
-    (str(s), str(p), str(o))
-    for s, p, o in g
-    if isinstance(s, URIRef) and isinstance(o, URIRef)
-]
-
-# === Step 3: Save all triples as TSV ===
-output_dir = "data/kge"
-os.makedirs(output_dir, exist_ok=True)
-
-all_triples_path = os.path.join(output_dir, "all_triples.tsv")
-pd.DataFrame(triples).to_csv(all_triples_path, sep="\t", index=False, header=False)
-print(f"Saved all entity-to-entity triples to {all_triples_path}")
-
-# === Step 4: Create PyKEEN TriplesFactory and split ===
-print("Creating stratified train/test splits using PyKEEN...")
-tf = TriplesFactory.from_path(all_triples_path, separator="\t")
-
-# Only train/test split
-train, test = tf.split(0.8)
-
-# Save the splits
-train_path = os.path.join(output_dir, "train.tsv")
-test_path = os.path.join(output_dir, "test.tsv")
-
-# Save splits 
-pd.DataFrame(train.triples).to_csv(train_path, sep="\t", index=False, header=False)
-pd.DataFrame(test.triples).to_csv(test_path, sep="\t", index=False, header=False)
-
-print(f"Saved:")
-print(f"- Train triples: {train_path} ({len(train.triples)} triples)")
-print(f"- Test triples:  {test_path} ({len(test.triples)} triples)")
+from rdflib import URIRef, Literal
+from compressed_io import glob_data, triples_factory, with_compression, write_tsv
+from instrumentation import span
+from rdf_snapshot import Snapshot, is_snapshot, open_graph
+
+ABOX_FILE = "data/ontology/dreamteam-b2-AkosSchneider_DinaraKurmangaliyeva.ttl"
+OUTPUT_DIR = "data/kge"
+
+
+def export_triples(abox_path=ABOX_FILE, output_dir=OUTPUT_DIR, compression=None):
+    """Write all entity-to-entity triples of the ABOX (literals excluded) to all_triples.tsv (.gz/.zst with compression)"""
+    if is_snapshot(abox_path):
+        # The snapshot is queried in place: filter on term ids, decode only the URIs used
+        print(f"Opening RDF snapshot {abox_path}...")
+        with span("split.filter") as stage, Snapshot(abox_path) as snapshot:
+            triples = snapshot.uri_triples()
+            stage.count("triples", len(snapshot))
+        return save_all_triples(triples, output_dir, compression)
+
+    if os.path.isdir(abox_path):
+        # Sharded output: only the TBOX and object-property shards, no literal shards
+        from abox_shards import load_entity_triples
+
+        print(f"Reading TBOX and relation shards from {abox_path}...")
+        return save_all_triples(load_entity_triples(abox_path), output_dir, compression)
+
+    # === Step 1: Load RDF graph ===
+    print(f"Loading RDF graph from {abox_path}...")
+    with span("split.parse") as stage:
+        g = open_graph(abox_path)
+        stage.count("triples", len(g))
+
+    # === Step 2: Filter triples ===
+    print("Extracting subject-predicate-object triples (excluding literals)...")
+    with span("split.filter") as stage:
+        triples = [
+            (str(s), str(p), str(o))
+            for s, p, o in g
+            if isinstance(s, URIRef) and isinstance(o, URIRef)
+        ]
+        stage.count("triples", len(g))
+
+    return save_all_triples(triples, output_dir, compression)
+
+
+def save_all_triples(triples, output_dir=OUTPUT_DIR, compression=None):
+    """Save (subject, predicate, object) label triples as a headerless, optionally compressed TSV"""
+    # === Step 3: Save all triples as TSV ===
+    os.makedirs(output_dir, exist_ok=True)
+
+    all_triples_path = with_compression(os.path.join(output_dir, "all_triples.tsv"), compression)
+    with span("split.save_all") as stage:
+        write_tsv(triples, all_triples_path)
+        stage.count("triples", len(triples))
+    print(f"Saved all entity-to-entity triples to {all_triples_path}")
+    return all_triples_path
+
+
+def remove_stale_valid(output_dir=OUTPUT_DIR):
+    """Delete a valid.tsv left by an earlier stratified split; the trainers would early-stop on it and
+    the incremental updater would skip its triples, although they now belong to train or test"""
+    for path in glob_data(os.path.join(output_dir, "valid.tsv")):
+        os.remove(path)
+
+
+def split_triples(all_triples_path, output_dir=OUTPUT_DIR, ratio=0.8, compression=None):
+    """Split all_triples.tsv into train.tsv/test.tsv with PyKEEN"""
+    # === Step 4: Create PyKEEN TriplesFactory and split ===
+    print("Creating stratified train/test splits using PyKEEN...")
+    with span("split.load_triples_factory") as stage:
+        tf = triples_factory(all_triples_path)
+        stage.count("triples", tf.num_triples)
+
+    # Only train/test split
+    with span("split.split") as stage:
+        train, test = tf.split(ratio)
+        stage.count("triples", tf.num_triples)
+
+    # Save the splits
+    train_path = with_compression(os.path.join(output_dir, "train.tsv"), compression)
+    test_path = with_compression(os.path.join(output_dir, "test.tsv"), compression)
+
+    # Save splits
+    with span("split.save_splits") as stage:
+        write_tsv(train.triples, train_path)
+        write_tsv(test.triples, test_path)
+        stage.count("triples", tf.num_triples)
+    remove_stale_valid(output_dir)
+
+    print(f"Saved:")
+    print(f"- Train triples: {train_path} ({len(train.triples)} triples)")
+    print(f"- Test triples:  {test_path} ({len(test.triples)} triples)")
+    return train_path, test_path
+
+
+def temporal_split_triples(all_triples_path, abox_path=ABOX_FILE, output_dir=OUTPUT_DIR, split_year=2020,
+                           compression=None):
+    """Split all_triples.tsv by time: train on the graph before split_year, test on later links"""
+    from temporal_index import TemporalTriples, load_year_index
+
+    # === Step 4: Date every triple through the year index and cut at split_year ===
+    print(f"Creating temporal train/test splits at {split_year}...")
+    with span("split.temporal") as stage:
+        temporal = TemporalTriples.from_tsv(all_triples_path, load_year_index(abox_path))
+        train, test = temporal.split(split_year)
+        stage.count("triples", len(temporal.triples))
+
+    train_path = with_compression(os.path.join(output_dir, "train.tsv"), compression)
+    test_path = with_compression(os.path.join(output_dir, "test.tsv"), compression)
+    with span("split.save_splits") as stage:
+        write_tsv(train, train_path)
+        write_tsv(test, test_path)
+        stage.count("triples", len(train) + len(test))
+    remove_stale_valid(output_dir)
+
+    print(f"Saved:")
+    print(f"- Train triples: {train_path} ({len(train)} triples, {len(temporal.undated())} undated, before {split_year})")
+    print(f"- Test triples:  {test_path} ({len(test)} triples from {split_year} on, "
+          f"{len(temporal.range(split_year)) - len(test)} dropped for unseen entities)")
+    return train_path, test_path
+
+
+def stratified_split_triples(all_triples_path, output_dir=OUTPUT_DIR, ratios=(0.8, 0.1, 0.1), compression=None):
+    """Split all_triples.tsv into train/valid/test.tsv per relation, keeping coupled triples together"""
+    from stratified_split import shortfalls, stratified_split
+
+    # === Step 4: Two streaming passes: assign every triple, then copy the lines ===
+    print("Creating relation-stratified train/valid/test splits...")
+    paths, table = stratified_split(all_triples_path, output_dir, ratios, compression=compression)
+    print(table.to_string())
+    for line in shortfalls(table, ratios):
+        print(f"Warning: {line}")
+    totals = table.sum()
+    print(f"Saved:")
+    for name, path in zip(table.columns, paths):
+        print(f"- {name.capitalize()} triples: {path} ({totals[name]} triples)")
+    return paths
+
+
+def main(abox_path=ABOX_FILE, output_dir=OUTPUT_DIR, split_year=None, compression=None, stratified=True):
+    all_triples_path = export_triples(abox_path, output_dir, compression)
+    if split_year is not None:
+        temporal_split_triples(all_triples_path, abox_path, output_dir, split_year, compression)
+    elif stratified:
+        stratified_split_triples(all_triples_path, output_dir, compression=compression)
+    else:
+        split_triples(all_triples_path, output_dir, compression=compression)
+
+
+if __name__ == "__main__":
+    main()
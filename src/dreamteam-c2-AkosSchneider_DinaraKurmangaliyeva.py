@@ -1,60 +1,123 @@
-from pykeen.pipeline import pipeline
-from pykeen.triples import TriplesFactory
 import numpy as np
-import pandas as pd
 import os
+from training_runtime import CHECKPOINT_MINUTES
 
-# === Load the data ===
-data_dir = "data/kge"
-train_path = os.path.join(data_dir, "train.tsv")
-test_path = os.path.join(data_dir, "test.tsv")
-
-# === Run the PyKEEN pipeline with TransE ===
-result = pipeline(
-    training=train_path,
-    testing=test_path,
-    model="TransE",
-    model_kwargs={"embedding_dim": 100},  
-    training_kwargs={"num_epochs": 100},  
-    random_seed=42
-)
-
-# === Get embeddings ===
-model = result.model
-entity_embeddings = model.entity_representations[0](indices=None).detach().numpy()
-relation_embeddings = model.relation_representations[0](indices=None).detach().numpy()
-
-entity_to_id = result.training.entity_to_id
-id_to_entity = {v: k for k, v in entity_to_id.items()}
-relation_to_id = result.training.relation_to_id
-id_to_relation = {v: k for k, v in relation_to_id.items()}
-
-# === Step 1: Choose a paper ===
-paper_uri = "http://example.org/publication-ontology#paper_conf_rlc_CramerFST24"  
-paper_vec = entity_embeddings[entity_to_id[paper_uri]]
-
-# === Step 2: Predict cited paper vector ===
-cite_vec = relation_embeddings[relation_to_id["http://example.org/publication-ontology#cite"]]
-predicted_cited_paper_vec = paper_vec + cite_vec
-
-# === Step 3: Predict cited paper's author vector ===
-has_author_vec = relation_embeddings[relation_to_id["http://example.org/publication-ontology#hasAuthor"]]
-predicted_author_vec = predicted_cited_paper_vec + has_author_vec
-
-# === Step 4: Find closest real author ===
-def find_closest_entity(target_vec, label_filter="author"):
-    distances = np.linalg.norm(entity_embeddings - target_vec, axis=1)
-    sorted_indices = np.argsort(distances)
-    for idx in sorted_indices:
-        candidate = id_to_entity[idx]
-        if label_filter in candidate.lower():
-            return candidate, distances[idx]
-    return None, None
-
-closest_author, dist = find_closest_entity(predicted_author_vec, label_filter="author")
-
-# === Output Results ===
-print("Most likely cited paper vector (TransE logic):", predicted_cited_paper_vec[:5], "...")
-print("Predicted author's vector (TransE logic):", predicted_author_vec[:5], "...")
-print(f"Closest actual author in KG: {closest_author}")
-print(f"Distance: {dist:.4f}")
+DATA_DIR = "data/kge"
+PAPER_URI = "http://example.org/publication-ontology#paper_conf_rlc_CramerFST24"
+CITE_URI = "http://example.org/publication-ontology#cite"
+HAS_AUTHOR_URI = "http://example.org/publication-ontology#hasAuthor"
+
+
+def train_transe(data_dir=DATA_DIR, use_ontology_sampler=False, num_workers=1, threads_per_worker=1, batch_size=None,
+                 checkpoint_minutes=CHECKPOINT_MINUTES):
+    """Train TransE on the train/test split, optionally with ontology-aware negatives and data-parallel workers;
+    single-process training stops early on valid.tsv when the split wrote one"""
+    from pykeen.pipeline import pipeline
+    from compressed_io import triples_factory
+    from ontology_sampler import OntologyNegativeSampler, build_candidate_pools
+    from training_runtime import checkpointed, early_stopping
+
+    # === Load the data ===
+    train_path = os.path.join(data_dir, "train.tsv")
+    test_path = os.path.join(data_dir, "test.tsv")
+    training = triples_factory(train_path)
+    testing = triples_factory(
+        test_path,
+        entity_to_id=training.entity_to_id,
+        relation_to_id=training.relation_to_id,
+    )
+
+    # === Negative sampling: uniform (PyKEEN default) or domain/range pools from the TBOX/ABOX ===
+    negative_sampler_kwargs = {}
+    if use_ontology_sampler:
+        negative_sampler_kwargs["candidate_pools"] = build_candidate_pools(training.entity_to_id, training.relation_to_id)
+
+    stopping = early_stopping(os.path.join(data_dir, "valid.tsv"), training) if num_workers <= 1 else {}
+    checkpoint = checkpointed("transe_100", train_path, checkpoint_minutes, ontology_sampler=use_ontology_sampler,
+                              workers=num_workers, batch_size=batch_size, early_stopping=bool(stopping))
+
+    if num_workers > 1:
+        from parallel_training import train_parallel
+
+        with checkpoint as checkpoint_kwargs:
+            return train_parallel(
+                training,
+                model="TransE",
+                model_kwargs={"embedding_dim": 100},
+                num_epochs=100,
+                batch_size=batch_size or 256,
+                num_workers=num_workers,
+                threads_per_worker=threads_per_worker,
+                negative_sampler=OntologyNegativeSampler if use_ontology_sampler else "basic",
+                negative_sampler_kwargs=negative_sampler_kwargs,
+                random_seed=42,
+                checkpoint_kwargs=checkpoint_kwargs,
+            )
+
+    # === Run the PyKEEN pipeline with TransE ===
+    with checkpoint as checkpoint_kwargs:
+        return pipeline(
+            training=training,
+            testing=testing,
+            model="TransE",
+            model_kwargs={"embedding_dim": 100},
+            negative_sampler=OntologyNegativeSampler if use_ontology_sampler else "basic",
+            negative_sampler_kwargs=negative_sampler_kwargs,
+            training_kwargs={"num_epochs": 100, "batch_size": batch_size, **checkpoint_kwargs},
+            random_seed=42,
+            **stopping,
+        )
+
+
+def predict_cited_author(result, paper_uri=PAPER_URI):
+    """Follow paper --cite--> ? --hasAuthor--> ? with TransE vector arithmetic and return the closest author"""
+    # === Get embeddings ===
+    model = result.model
+    entity_embeddings = model.entity_representations[0](indices=None).detach().numpy()
+    relation_embeddings = model.relation_representations[0](indices=None).detach().numpy()
+
+    entity_to_id = result.training.entity_to_id
+    id_to_entity = {v: k for k, v in entity_to_id.items()}
+    relation_to_id = result.training.relation_to_id
+
+    # === Step 1: Choose a paper ===
+    paper_vec = entity_embeddings[entity_to_id[paper_uri]]
+
+    # === Step 2: Predict cited paper vector ===
+    cite_vec = relation_embeddings[relation_to_id[CITE_URI]]
+    predicted_cited_paper_vec = paper_vec + cite_vec
+
+    # === Step 3: Predict cited paper's author vector ===
+    has_author_vec = relation_embeddings[relation_to_id[HAS_AUTHOR_URI]]
+    predicted_author_vec = predicted_cited_paper_vec + has_author_vec
+
+    # === Step 4: Find closest real author ===
+    def find_closest_entity(target_vec, label_filter="author"):
+        distances = np.linalg.norm(entity_embeddings - target_vec, axis=1)
+        sorted_indices = np.argsort(distances)
+        for idx in sorted_indices:
+            candidate = id_to_entity[idx]
+            if label_filter in candidate.lower():
+                return candidate, distances[idx]
+        return None, None
+
+    closest_author, dist = find_closest_entity(predicted_author_vec, label_filter="author")
+    return predicted_cited_paper_vec, predicted_author_vec, closest_author, dist
+
+
+def main(paper_uri=PAPER_URI, use_ontology_sampler=False, num_workers=1, threads_per_worker=1, batch_size=None,
+         checkpoint_minutes=CHECKPOINT_MINUTES):
+    result = train_transe(use_ontology_sampler=use_ontology_sampler, num_workers=num_workers,
+                          threads_per_worker=threads_per_worker, batch_size=batch_size,
+                          checkpoint_minutes=checkpoint_minutes)
+    predicted_cited_paper_vec, predicted_author_vec, closest_author, dist = predict_cited_author(result, paper_uri)
+
+    # === Output Results ===
+    print("Most likely cited paper vector (TransE logic):", predicted_cited_paper_vec[:5], "...")
+    print("Predicted author's vector (TransE logic):", predicted_author_vec[:5], "...")
+    print(f"Closest actual author in KG: {closest_author}")
+    print(f"Distance: {dist:.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,11 @@
 import os
-import pandas as pd
-from pykeen.pipeline import pipeline
+from instrumentation import span
 
 # === File paths ===
 train_path = "data/kge/train.tsv"
 test_path = "data/kge/test.tsv"
+valid_path = "data/kge/valid.tsv"
+output_path = "data/kge/kge_model_comparison.csv"
 
 # === Experiment configurations ===
 models_to_run = [
@@ -19,41 +20,102 @@ models_to_run = [
 
     # Other models 
     {"model": "ComplEx", "embedding_dim": 150, "neg": 15},
-    {"model": "DistMult", "embedding_dim": 100, "neg": 20}
+    {"model": "DistMult", "embedding_dim": 100, "neg": 20},
+
+    # Ontology-aware negatives (domain/range candidate pools), shorter schedule
+    {"model": "TransE", "embedding_dim": 100, "neg": 15, "sampler": "ontology", "epochs": 30},
+    {"model": "TransH", "embedding_dim": 50, "neg": 5, "sampler": "ontology", "epochs": 30},
 ]
 
-results = []
-
-# === Run experiments ===
-for config in models_to_run:
-    print(f"\nRunning {config['model']} | dim={config['embedding_dim']} | neg={config['neg']}")
-    result = pipeline(
-        training=train_path,
-        testing=test_path,
-        model=config["model"],
-        model_kwargs={"embedding_dim": config["embedding_dim"]},
-        negative_sampler_kwargs={"num_negs_per_pos": config["neg"]},
-        training_kwargs={"num_epochs": 100},
-        random_seed=42,
-        device="cpu"  
-    )
-    
-    metrics = result.metric_results.to_flat_dict()
-    
-    results.append({
-    "Model": config["model"],
-    "Embedding Dim": config["embedding_dim"],
-    "Neg Samples": config["neg"],
-    "MRR": round(metrics.get("both.realistic.inverse_harmonic_mean_rank", 0), 4),
-    "Hits@1": round(metrics.get("both.realistic.hits_at_1", 0), 4),
-    "Hits@10": round(metrics.get("both.realistic.hits_at_10", 0), 4),
-})
-
-# === Output Results Table ===
-df = pd.DataFrame(results)
-print("\nModel Comparison Results:")
-print(df.to_string(index=False))
-
-# Save to CSV for report use
-os.makedirs("data/kge", exist_ok=True)
-df.to_csv("data/kge/kge_model_comparison.csv", index=False)
+def run_sweep(configs=models_to_run, train_path=train_path, test_path=test_path, valid_path=valid_path):
+    """Train and evaluate every configuration and return the comparison table.
+
+    With a valid.tsv from split --stratified each run stops early on it, and "Epochs" is the
+    number of epochs actually trained.
+
+    Each configuration checkpoints on its own (training_runtime.py), so an interrupted sweep
+    resumes inside the configuration it was training when started again.
+    """
+    import pandas as pd
+    from pykeen.pipeline import pipeline
+    from compressed_io import triples_factory
+    from ontology_sampler import OntologyNegativeSampler, build_candidate_pools
+    from training_runtime import checkpointed, early_stopping
+
+    # === Shared entity/relation mapping, so the candidate pools are built only once ===
+    with span("sweep.load_triples") as stage:
+        training = triples_factory(train_path)
+        testing = triples_factory(
+            test_path,
+            entity_to_id=training.entity_to_id,
+            relation_to_id=training.relation_to_id,
+        )
+        stopping = early_stopping(valid_path, training)
+        stage.count("triples", training.num_triples + testing.num_triples)
+    with span("sweep.candidate_pools"):
+        candidate_pools = build_candidate_pools(training.entity_to_id, training.relation_to_id)
+
+    results = []
+
+    # === Run experiments ===
+    for config in configs:
+        sampler = config.get("sampler", "basic")
+        epochs = config.get("epochs", 100)
+        print(f"\nRunning {config['model']} | dim={config['embedding_dim']} | neg={config['neg']} | sampler={sampler} | epochs={epochs}")
+
+        sampler_kwargs = {"num_negs_per_pos": config["neg"]}
+        if sampler == "ontology":
+            sampler_kwargs["candidate_pools"] = candidate_pools
+
+        run_name = f"{config['model']}_{config['embedding_dim']}_{config['neg']}_{sampler}"
+        with span(f"sweep.{run_name}") as stage, \
+                checkpointed(f"sweep-{run_name}", train_path, epochs=epochs,
+                             early_stopping=bool(stopping)) as checkpoint_kwargs:
+            result = pipeline(
+                training=training,
+                testing=testing,
+                model=config["model"],
+                model_kwargs={"embedding_dim": config["embedding_dim"]},
+                negative_sampler=OntologyNegativeSampler if sampler == "ontology" else "basic",
+                negative_sampler_kwargs=sampler_kwargs,
+                training_kwargs={"num_epochs": epochs, **checkpoint_kwargs},
+                random_seed=42,
+                device="cpu",
+                **stopping,
+            )
+            # pipeline() times training and evaluation separately; the rest is setup/data loading
+            epochs = len(result.losses)
+            stage.count("epochs", epochs)
+            stage.count("training_triples", epochs * training.num_triples)
+            stage.annotate(train_seconds=result.train_seconds, evaluate_seconds=result.evaluate_seconds)
+
+        metrics = result.metric_results.to_flat_dict()
+
+        results.append({
+            "Model": config["model"],
+            "Embedding Dim": config["embedding_dim"],
+            "Neg Samples": config["neg"],
+            "Sampler": sampler,
+            "Epochs": epochs,
+            "MRR": round(metrics.get("both.realistic.inverse_harmonic_mean_rank", 0), 4),
+            "Hits@1": round(metrics.get("both.realistic.hits_at_1", 0), 4),
+            "Hits@10": round(metrics.get("both.realistic.hits_at_10", 0), 4),
+        })
+
+    return pd.DataFrame(results)
+
+
+def main(output_path=output_path):
+    df = run_sweep()
+
+    # === Output Results Table ===
+    print("\nModel Comparison Results:")
+    print(df.to_string(index=False))
+
+    # Save to CSV for report use
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    df.to_csv(output_path, index=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,70 +1,130 @@
 import os
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-from sklearn.cluster import KMeans
-from sklearn.decomposition import PCA
-from sklearn.metrics import silhouette_score
+from compressed_io import resolve
+from instrumentation import span
 
 # === Paths to embedding and mapping files ===
 embedding_path = "data/kge/transh_50_5/entity_embeddings.npy"
 entity_map_path = "data/kge/transh_50_5/entity_to_id.csv"
-
-# === Load embeddings and entities ===
-print("Loading embeddings and entity mappings...")
-embeddings = np.load(embedding_path)
-entity_df = pd.read_csv(entity_map_path, names=["entity", "id"])
-entity_df = entity_df.sort_values("id").reset_index(drop=True)
-
-# === Filter only author entities ===
-print("Filtering author entities...")
-author_mask = entity_df["entity"].str.contains("author_")
-author_entities = entity_df[author_mask].reset_index(drop=True)
-author_entities["id"] = author_entities["id"].astype(int)  # Ensure it's integer
-author_embeddings = embeddings[author_entities["id"].values]
-
-# === Perform KMeans clustering with k=4 ===
-n_clusters = 4
-print(f"Clustering author embeddings into {n_clusters} groups...")
-kmeans = KMeans(n_clusters=n_clusters, random_state=42)
-author_entities["cluster"] = kmeans.fit_predict(author_embeddings)
-
-# === Compute silhouette score ===
-sil_score = silhouette_score(author_embeddings, author_entities["cluster"])
-print(f"Silhouette Score (k={n_clusters}): {sil_score:.4f}")
-
-# === Dimensionality Reduction for Visualization ===
-print("Reducing dimensions using PCA for visualization...")
-pca = PCA(n_components=2)
-pca_result = pca.fit_transform(author_embeddings)
-
-# Add to DataFrame
-author_entities["x"] = pca_result[:, 0]
-author_entities["y"] = pca_result[:, 1]
-
-# === Plot the clusters ===
-print("Generating cluster plot...")
-plt.figure(figsize=(10, 6))
-for i in range(n_clusters):
-    cluster_points = author_entities[author_entities["cluster"] == i]
-    plt.scatter(cluster_points["x"], cluster_points["y"], label=f"Cluster {i}", alpha=0.7)
-
-plt.title("Author Clusters (PCA Projection)")
-plt.xlabel("PCA Component 1")
-plt.ylabel("PCA Component 2")
-plt.legend()
-plt.grid(True)
-
-# === Save outputs ===
 output_dir = "data/kge/clustering/authors"
-os.makedirs(output_dir, exist_ok=True)
-plot_path = os.path.join(output_dir, "authors_clusters_pca_k4.png")
-csv_path = os.path.join(output_dir, "authors_clusters_k4.csv")
+max_scatter_points = 20000  # above this the plot is a density raster instead of a scatter
+minibatch_threshold = 100000  # above this many authors KMeans streams batches (MiniBatchKMeans)
+kmeans_passes = 10          # MiniBatchKMeans partial_fit passes over the author batches
+silhouette_sample = 10000   # authors the silhouette score is computed on
+
+
+def cluster_authors(embedding_path=embedding_path, entity_map_path=entity_map_path, n_clusters=4, projection="ipca"):
+    """KMeans over the author embeddings; returns the authors with cluster and 2D projected coordinates plus the silhouette score"""
+    from sklearn.cluster import KMeans, MiniBatchKMeans
+    from sklearn.metrics import silhouette_score
+    from embedding_projection import iter_batches, project
+
+    # === Load embeddings and entities ===
+    print("Loading embeddings and entity mappings...")
+    with span("cluster.load") as stage:
+        embeddings = np.load(resolve(embedding_path), mmap_mode="r")
+        entity_df = pd.read_csv(resolve(entity_map_path), names=["entity", "id"])
+        entity_df = entity_df.sort_values("id").reset_index(drop=True)
+        stage.count("rows", len(entity_df))
+
+    # === Filter only author entities ===
+    print("Filtering author entities...")
+    author_mask = entity_df["entity"].str.contains("author_")
+    author_entities = entity_df[author_mask].reset_index(drop=True)
+    author_entities["id"] = author_entities["id"].astype(int)  # Ensure it's integer
+    author_rows = author_entities["id"].values  # ascending, so batches are sequential mmap reads
+
+    # === Perform KMeans clustering ===
+    # Up to minibatch_threshold authors this is the exact KMeans on the loaded author matrix.
+    # Above it, MiniBatchKMeans streams the same batches as the projection, so the author matrix
+    # is never materialised; its clusters are an approximation and can differ from KMeans.
+    print(f"Clustering author embeddings into {n_clusters} groups...")
+    if len(author_rows) < n_clusters:
+        raise ValueError(f"{len(author_rows)} authors cannot form {n_clusters} clusters")
+    with span("cluster.kmeans") as stage:
+        if len(author_rows) <= minibatch_threshold:
+            kmeans = KMeans(n_clusters=n_clusters, random_state=42)
+            author_entities["cluster"] = kmeans.fit_predict(np.asarray(embeddings[author_rows], dtype=np.float32))
+        else:
+            kmeans = MiniBatchKMeans(n_clusters=n_clusters, random_state=42, n_init=3)
+            for _ in range(kmeans_passes):
+                for batch in iter_batches(embeddings, author_rows):
+                    kmeans.partial_fit(batch)
+            author_entities["cluster"] = np.concatenate([kmeans.predict(batch) for batch in iter_batches(embeddings, author_rows)])
+        stage.count("rows", len(author_rows))
+
+    # === Compute silhouette score ===
+    # Silhouette is quadratic in the rows, so it is estimated on a random sample of authors
+    with span("cluster.silhouette") as stage:
+        rng = np.random.default_rng(42)
+        sample = np.sort(rng.choice(len(author_rows), size=min(silhouette_sample, len(author_rows)), replace=False))
+        sil_score = silhouette_score(np.asarray(embeddings[author_rows[sample]], dtype=np.float32),
+                                     author_entities["cluster"].values[sample])
+        stage.count("rows", len(sample))
+    print(f"Silhouette Score (k={n_clusters}): {sil_score:.4f}")
+
+    # === Dimensionality Reduction for Visualization ===
+    # IncrementalPCA (or a random projection) streams batches from the memory-mapped matrix
+    print(f"Reducing dimensions using {projection} for visualization...")
+    with span("cluster.projection") as stage:
+        coordinates = project(embeddings, author_entities["id"].values, method=projection)
+        stage.count("rows", len(author_rows))
+
+    # Add to DataFrame
+    author_entities["x"] = coordinates[:, 0]
+    author_entities["y"] = coordinates[:, 1]
+    return author_entities, sil_score
+
+
+def plot_clusters(author_entities, n_clusters, projection="ipca"):
+    """Scatter plot of the 2D projection, one colour per cluster"""
+    import matplotlib.pyplot as plt
+    from embedding_projection import LABELS
+
+    print("Generating cluster plot...")
+    plt.figure(figsize=(10, 6))
+    for i in range(n_clusters):
+        cluster_points = author_entities[author_entities["cluster"] == i]
+        plt.scatter(cluster_points["x"], cluster_points["y"], label=f"Cluster {i}", alpha=0.7)
+
+    plt.title(f"Author Clusters ({LABELS[projection]} Projection)")
+    plt.xlabel(f"{LABELS[projection]} Component 1")
+    plt.ylabel(f"{LABELS[projection]} Component 2")
+    plt.legend()
+    plt.grid(True)
+    return plt
+
+
+def main(n_clusters=4, output_dir=output_dir, projection="ipca", density=None):
+    author_entities, sil_score = cluster_authors(n_clusters=n_clusters, projection=projection)
+    if density is None:
+        density = len(author_entities) > max_scatter_points
+    if density:
+        from embedding_projection import plot_density
+
+        plt = plot_density(author_entities[["x", "y"]].values, author_entities["cluster"].values, n_clusters,
+                           method=projection)
+    else:
+        plt = plot_clusters(author_entities, n_clusters, projection)
+
+    # === Save outputs ===
+    os.makedirs(output_dir, exist_ok=True)
+    from embedding_projection import LABELS
+
+    plot_path = os.path.join(output_dir, f"authors_clusters_{LABELS[projection].lower()}_k{n_clusters}.png")
+    csv_path = os.path.join(output_dir, f"authors_clusters_k{n_clusters}.csv")
+
+    with span("cluster.save") as stage:
+        plt.savefig(plot_path)
+        author_entities.to_csv(csv_path, index=False)
+        stage.count("rows", len(author_entities))
+
+    print(f"\Clustering complete!")
+    print(f"• Plot saved to: {plot_path}")
+    print(f"• Clustered author list saved to: {csv_path}")
+    print(f"• Silhouette Score: {sil_score:.4f}")
 
-plt.savefig(plot_path)
-author_entities.to_csv(csv_path, index=False)
 
-print(f"\Clustering complete!")
-print(f"• Plot saved to: {plot_path}")
-print(f"• Clustered author list saved to: {csv_path}")
-print(f"• Silhouette Score: {sil_score:.4f}")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+import json
+import os
+import time
+
+import numpy as np
+from rdflib import Namespace, URIRef
+from instrumentation import span
+
+PUB = Namespace("http://example.org/publication-ontology#")
+ABOX_FILE = "data/ontology/dreamteam-b2-AkosSchneider_DinaraKurmangaliyeva.ttl"
+INDEX_DIR = "data/search/ego_index"
+DIRECTIONS = ("out", "in", "both")
+
+# k-hop neighbourhoods for explaining predictions. The index holds the pub: relations between
+# entities (rdf:type and schema triples are left out, every paper would otherwise be two hops
+# from every other) as two CSR adjacency lists, outgoing and incoming. Each node's row is sorted
+# by relation, so a relation filter and the per-relation fan-out cap work on contiguous runs.
+
+ARRAYS = ["out_ptr", "out_node", "out_relation", "in_ptr", "in_node", "in_relation"]
+
+
+def entity_triples(abox_path=ABOX_FILE):
+    """(s, p, o) strings of the pub: relations between IRIs, from a Turtle file, .rdfsnap or shard directory"""
+    from rdf_snapshot import Snapshot, is_snapshot, open_graph
+
+    if is_snapshot(abox_path):
+        with Snapshot(abox_path) as snapshot:
+            triples = snapshot.uri_triples()
+    elif os.path.isdir(abox_path):
+        from abox_shards import load_entity_triples
+
+        triples = load_entity_triples(abox_path, kinds=("relation",))
+    else:
+        triples = [(str(s), str(p), str(o)) for s, p, o in open_graph(abox_path)
+                   if isinstance(s, URIRef) and isinstance(o, URIRef)]
+    return [t for t in triples if t[1].startswith(str(PUB))]
+
+
+def adjacency(sources, relations, targets, num_nodes):
+    """CSR rows over sources, each row sorted by (relation, target)"""
+    order = np.lexsort((targets, relations, sources))
+    ptr = np.zeros(num_nodes + 1, dtype=np.int64)
+    ptr[1:] = np.cumsum(np.bincount(sources, minlength=num_nodes))
+    return ptr, targets[order].astype(np.int32), relations[order].astype(np.uint16)
+
+
+def build_index(triples, index_dir=INDEX_DIR):
+    """Factorize the triples and write both adjacency directions plus the label lists to index_dir"""
+    import pandas as pd
+
+    with span("ego_index.build") as stage:
+        triples = np.asarray(triples, dtype=object).reshape(-1, 3)
+        codes, entities = pd.factorize(np.concatenate([triples[:, 0], triples[:, 2]]))
+        relation_codes, relations = pd.factorize(triples[:, 1])
+        sources, targets = codes[:len(triples)], codes[len(triples):]
+
+        arrays = {}
+        arrays["out_ptr"], arrays["out_node"], arrays["out_relation"] = adjacency(
+            sources, relation_codes, targets, len(entities))
+        arrays["in_ptr"], arrays["in_node"], arrays["in_relation"] = adjacency(
+            targets, relation_codes, sources, len(entities))
+        stage.count("edges", len(triples))
+
+    os.makedirs(index_dir, exist_ok=True)
+    for name, array in arrays.items():
+        np.save(os.path.join(index_dir, f"{name}.npy"), array)
+    for name, value in (("entities", list(entities)), ("relations", list(relations))):
+        with open(os.path.join(index_dir, f"{name}.json"), "w", encoding="utf-8") as file:
+            json.dump(value, file)
+    return len(entities), len(triples)
+
+
+def gather(ptr, nodes, relations, frontier, relation_mask=None, max_fanout=None):
+    """(owner, relation, neighbour) for the edges of the frontier rows; with max_fanout at most
+    that many edges per (node, relation) are kept, the first ones in target order"""
+    starts = ptr[frontier]
+    lengths = ptr[frontier + 1] - starts
+    offsets = np.cumsum(lengths) - lengths
+    positions = np.repeat(starts - offsets, lengths) + np.arange(lengths.sum())
+    owners = np.repeat(frontier, lengths)
+    edge_relations = relations[positions]
+    if relation_mask is not None:
+        keep = relation_mask[edge_relations]
+        positions, owners, edge_relations = positions[keep], owners[keep], edge_relations[keep]
+    if max_fanout and len(positions):
+        # Rows are sorted by relation, so each (owner, relation) group is one contiguous run
+        new_group = np.ones(len(positions), dtype=bool)
+        new_group[1:] = (owners[1:] != owners[:-1]) | (edge_relations[1:] != edge_relations[:-1])
+        group_start = np.maximum.accumulate(np.where(new_group, np.arange(len(positions)), 0))
+        keep = np.arange(len(positions)) - group_start < max_fanout
+        positions, owners, edge_relations = positions[keep], owners[keep], edge_relations[keep]
+    return owners, edge_relations, np.asarray(nodes[positions], dtype=np.int64)
+
+
+class EgoNetwork:
+    """A BFS result: node ids with their hop distance and the traversed (s, p, o) edges as ids"""
+
+    def __init__(self, index, center, nodes, hops, edges):
+        self.index = index
+        self.center = center
+        self.nodes = nodes
+        self.hops = hops
+        self.edges = edges
+
+    def triples(self):
+        entities, relations = self.index.entities, self.index.relations
+        return [(entities[s], relations[p], entities[o]) for s, p, o in self.edges.tolist()]
+
+    def to_json(self):
+        entities = self.index.entities
+        return {
+            "center": entities[self.center],
+            "nodes": [{"id": entities[n], "hop": h} for n, h in zip(self.nodes.tolist(), self.hops.tolist())],
+            "edges": [{"source": s, "relation": p, "target": o} for s, p, o in self.triples()],
+        }
+
+    def to_graph(self):
+        from rdflib import Graph
+
+        g = Graph()
+        g.bind("pub", PUB)
+        for s, p, o in self.triples():
+            g.add((URIRef(s), URIRef(p), URIRef(o)))
+        return g
+
+    def to_turtle(self):
+        return self.to_graph().serialize(format="turtle")
+
+
+class EgoIndex:
+    """k-hop neighbourhood queries over a built index; the adjacency arrays are memory-mapped"""
+
+    def __init__(self, index_dir=INDEX_DIR):
+        self.arrays = {name: np.load(os.path.join(index_dir, f"{name}.npy"), mmap_mode="r") for name in ARRAYS}
+        with open(os.path.join(index_dir, "entities.json"), encoding="utf-8") as file:
+            self.entities = json.load(file)
+        with open(os.path.join(index_dir, "relations.json"), encoding="utf-8") as file:
+            self.relations = json.load(file)
+        self.entity_id = {uri: i for i, uri in enumerate(self.entities)}
+        self.relation_id = {uri: i for i, uri in enumerate(self.relations)}
+
+    def lookup(self, entity):
+        """Id of a full URI or a pub: local name such as paper_conf_rlc_CramerFST24"""
+        entity_id = self.entity_id.get(entity, self.entity_id.get(str(PUB[entity])))
+        if entity_id is None:
+            raise KeyError(f"Unknown entity {entity!r}")
+        return entity_id
+
+    def relation_mask(self, relations):
+        if not relations:
+            return None
+        mask = np.zeros(len(self.relations), dtype=bool)
+        for relation in relations:
+            relation_id = self.relation_id.get(relation, self.relation_id.get(str(PUB[relation])))
+            if relation_id is None:
+                raise KeyError(f"Unknown relation {relation!r}; known: {sorted(r.rsplit('#', 1)[-1] for r in self.relations)}")
+            mask[relation_id] = True
+        return mask
+
+    def ego(self, entity, hops=2, relations=None, direction="both", max_fanout=50):
+        """BFS from entity up to `hops` steps along the given relations (all if None), following
+        edges forwards ("out"), backwards ("in") or both ways. max_fanout caps the edges taken per
+        node and relation on every hop, so hubs such as topics or venues do not flood the result."""
+        if direction not in DIRECTIONS:
+            raise ValueError(f"Unknown direction {direction!r}; expected one of {DIRECTIONS}")
+        center = self.lookup(entity)
+        mask = self.relation_mask(relations)
+        sides = [side for side in ("out", "in") if direction in (side, "both")]
+
+        visited = np.array([center], dtype=np.int64)
+        hop_of = [np.zeros(1, dtype=np.int64)]
+        frontier = visited
+        edges = []
+        for hop in range(1, hops + 1):
+            reached = []
+            for side in sides:
+                owners, edge_relations, neighbours = gather(
+                    self.arrays[f"{side}_ptr"], self.arrays[f"{side}_node"], self.arrays[f"{side}_relation"],
+                    frontier, mask, max_fanout)
+                pairs = (owners, neighbours) if side == "out" else (neighbours, owners)
+                edges.append(np.stack([pairs[0], edge_relations.astype(np.int64), pairs[1]], axis=1))
+                reached.append(neighbours)
+            frontier = np.setdiff1d(np.concatenate(reached), visited)
+            if not len(frontier):
+                break
+            visited = np.concatenate([visited, frontier])
+            hop_of.append(np.full(len(frontier), hop, dtype=np.int64))
+
+        edges = np.unique(np.concatenate(edges), axis=0) if edges else np.empty((0, 3), dtype=np.int64)
+        return EgoNetwork(self, center, visited, np.concatenate(hop_of), edges)
+
+
+def main(abox_path=ABOX_FILE, index_dir=INDEX_DIR):
+    with span("ego_index.load") as stage:
+        triples = entity_triples(abox_path)
+        stage.count("triples", len(triples))
+    start = time.perf_counter()
+    num_entities, num_edges = build_index(triples, index_dir)
+    print(f"Indexed {num_edges} edges between {num_entities} entities into {index_dir} "
+          f"in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
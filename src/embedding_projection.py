@@ -0,0 +1,101 @@
+import numpy as np
+from instrumentation import span
+
+# 2-D views of embedding matrices of any size. The projection streams row batches from a
+# memory-mapped .npy, so only one batch is in memory at a time, and the plot is a per-cluster
+# density raster whose cost depends on the number of bins rather than the number of points.
+
+batch_size = 65536        # rows per IncrementalPCA / projection batch
+bins = 400                # raster resolution per axis
+overlay_per_cluster = 200  # points per cluster drawn on top of the raster (0 = none)
+LABELS = {"ipca": "PCA", "random": "Random"}  # plot title, axis and file names per method
+
+
+def iter_batches(embeddings, rows, batch_size=batch_size):
+    """Float32 batches of the selected rows, in ascending row order for sequential mmap reads"""
+    for start in range(0, len(rows), batch_size):
+        yield np.asarray(embeddings[rows[start:start + batch_size]], dtype=np.float32)
+
+
+def project(embeddings, rows=None, method="ipca", batch_size=batch_size, random_state=42):
+    """2-D coordinates, in the order of `rows`, for rows of an (optionally memory-mapped) matrix.
+
+    method="ipca" fits IncrementalPCA batch by batch, giving the same axes as a full PCA up to
+    sign; method="random" uses a Gaussian random projection, a single pass with no fit.
+    """
+    rows = np.arange(embeddings.shape[0]) if rows is None else np.asarray(rows)
+    order = np.argsort(rows, kind="stable")
+    sorted_rows = rows[order]
+    with span(f"projection.{method}") as stage:
+        if method == "ipca":
+            from sklearn.decomposition import IncrementalPCA
+
+            ipca = IncrementalPCA(n_components=2)
+            for batch in iter_batches(embeddings, sorted_rows, batch_size):
+                if len(batch) >= 2:  # partial_fit needs at least n_components rows
+                    ipca.partial_fit(batch)
+            transform = ipca.transform
+        elif method == "random":
+            rng = np.random.default_rng(random_state)
+            components = rng.standard_normal((embeddings.shape[1], 2)).astype(np.float32) / np.sqrt(2)
+            transform = lambda batch: batch @ components
+        else:
+            raise ValueError(f"Unknown projection method {method!r}")
+
+        coordinates = np.empty((len(rows), 2), dtype=np.float32)
+        coordinates[order] = np.concatenate([transform(b) for b in iter_batches(embeddings, sorted_rows, batch_size)])
+        stage.count("rows", len(rows))
+    return coordinates
+
+
+def density_rasters(coordinates, labels, n_clusters, bins=bins, clip=(0.5, 99.5)):
+    """Per-cluster 2-D histograms over a shared extent; outliers beyond the clip percentiles
+    land in the border bins. Returns (counts of shape (n_clusters, bins, bins), extent)."""
+    low = np.percentile(coordinates, clip[0], axis=0)
+    high = np.percentile(coordinates, clip[1], axis=0)
+    high = np.where(high > low, high, low + 1)
+    clipped = np.clip(coordinates, low, high)
+    counts = np.zeros((n_clusters, bins, bins), dtype=np.int64)
+    for cluster in range(n_clusters):
+        points = clipped[labels == cluster]
+        counts[cluster], _, _ = np.histogram2d(points[:, 1], points[:, 0], bins=bins,
+                                               range=[[low[1], high[1]], [low[0], high[0]]])
+    return counts, (low[0], high[0], low[1], high[1])
+
+
+def stratified_sample(labels, per_cluster=overlay_per_cluster, random_state=42):
+    """Up to `per_cluster` random positions from every cluster"""
+    rng = np.random.default_rng(random_state)
+    picks = []
+    for cluster in np.unique(labels):
+        members = np.flatnonzero(labels == cluster)
+        picks.append(rng.choice(members, size=min(per_cluster, len(members)), replace=False))
+    return np.sort(np.concatenate(picks)) if picks else np.empty(0, dtype=np.int64)
+
+
+def plot_density(coordinates, labels, n_clusters, bins=bins, overlay_per_cluster=overlay_per_cluster,
+                 method="ipca", title=None):
+    """One RGBA raster: each pixel takes the colour of its dominant cluster, and its opacity
+    grows with the log of the point count. An optional stratified sample is drawn on top.
+    Axes (and the default title) are named after the projection method."""
+    import matplotlib.pyplot as plt
+
+    counts, extent = density_rasters(coordinates, labels, n_clusters, bins)
+    total = counts.sum(axis=0)
+    colors = plt.get_cmap("tab10")(np.arange(n_clusters) % 10)
+    image = colors[counts.argmax(axis=0)]
+    image[..., 3] = np.log1p(total) / max(np.log1p(total.max()), 1e-12)
+
+    plt.figure(figsize=(10, 6))
+    plt.imshow(image, origin="lower", extent=extent, aspect="auto", interpolation="nearest")
+    if overlay_per_cluster:
+        sample = stratified_sample(labels, overlay_per_cluster)
+        plt.scatter(coordinates[sample, 0], coordinates[sample, 1], c=colors[labels[sample]],
+                    s=4, edgecolors="none", alpha=0.6)
+    for cluster in range(n_clusters):
+        plt.scatter([], [], color=colors[cluster], label=f"Cluster {cluster} ({int(counts[cluster].sum())})")
+    plt.title(title or f"Author Clusters ({LABELS[method]} Projection)")
+    plt.xlabel(f"{LABELS[method]} Component 1")
+    plt.ylabel(f"{LABELS[method]} Component 2")
+    plt.legend()
+    return plt
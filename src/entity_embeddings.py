@@ -1,37 +1,127 @@
 import os
-import numpy as np
-import pandas as pd
-from pykeen.pipeline import pipeline
-
-# === Load the best configuration ===
-result = pipeline(
-    training='data/kge/train.tsv',
-    testing='data/kge/test.tsv',
-    model='TransH',
-    model_kwargs={'embedding_dim': 50},
-    negative_sampler_kwargs={'num_negs_per_pos': 5},
-    training_kwargs={'num_epochs': 100},
-    random_seed=42,
-    device='cpu'
-)
-
-# === Extract entity embeddings ===
-model = result.model
-entity_embeddings = model.entity_representations[0](indices=None).detach().numpy()
-
-# === Get entity-to-ID mapping ===
-entity_to_id = result.training.entity_to_id
-entity_id_df = pd.DataFrame({
-    "entity": list(entity_to_id.keys()),
-    "id": list(entity_to_id.values())
-}).sort_values("id")
-
-# === Save outputs ===
+
+from training_runtime import CHECKPOINT_MINUTES
+
+train_path = "data/kge/train.tsv"
+test_path = "data/kge/test.tsv"
+valid_path = "data/kge/valid.tsv"
 output_dir = "data/kge/transh_50_5"
-os.makedirs(output_dir, exist_ok=True)
 
-np.save(os.path.join(output_dir, "entity_embeddings.npy"), entity_embeddings)
-entity_id_df.to_csv(os.path.join(output_dir, "entity_to_id.csv"), index=False)
 
-print(f"Saved entity embeddings to {output_dir}/entity_embeddings.npy")
-print(f"Saved entity-to-id mapping to {output_dir}/entity_to_id.csv")
+def train_embeddings(train_path=train_path, test_path=test_path, valid_path=valid_path, use_ontology_sampler=False,
+                     num_workers=1, threads_per_worker=1, batch_size=None, checkpoint_minutes=CHECKPOINT_MINUTES):
+    """Train the best sweep configuration (TransH, dim 50, 5 negatives) and return the pipeline result.
+
+    With num_workers > 1 training runs in data-parallel worker processes (see parallel_training.py)
+    and the returned result carries the model and mapping but no evaluation. Otherwise training
+    stops early on valid.tsv when the split wrote one. An interrupted run resumes from its
+    checkpoint (see training_runtime.py) when started again.
+    """
+    from pykeen.pipeline import pipeline
+    from compressed_io import triples_factory
+    from ontology_sampler import OntologyNegativeSampler, build_candidate_pools
+    from training_runtime import checkpointed, early_stopping
+
+    # === Load the train/test triples with a shared entity/relation mapping ===
+    training = triples_factory(train_path)
+    testing = triples_factory(
+        test_path,
+        entity_to_id=training.entity_to_id,
+        relation_to_id=training.relation_to_id,
+    )
+
+    # === Negative sampling: uniform (PyKEEN default) or domain/range pools from the TBOX/ABOX ===
+    negative_sampler_kwargs = {'num_negs_per_pos': 5}
+    if use_ontology_sampler:
+        negative_sampler_kwargs['candidate_pools'] = build_candidate_pools(training.entity_to_id, training.relation_to_id)
+
+    stopping = early_stopping(valid_path, training) if num_workers <= 1 else {}
+    checkpoint = checkpointed('transh_50_5', train_path, checkpoint_minutes, ontology_sampler=use_ontology_sampler,
+                              workers=num_workers, batch_size=batch_size, early_stopping=bool(stopping))
+
+    if num_workers > 1:
+        from parallel_training import train_parallel
+
+        with checkpoint as checkpoint_kwargs:
+            return train_parallel(
+                training,
+                model='TransH',
+                model_kwargs={'embedding_dim': 50},
+                num_epochs=100,
+                batch_size=batch_size or 256,
+                num_workers=num_workers,
+                threads_per_worker=threads_per_worker,
+                negative_sampler=OntologyNegativeSampler if use_ontology_sampler else 'basic',
+                negative_sampler_kwargs=negative_sampler_kwargs,
+                random_seed=42,
+                checkpoint_kwargs=checkpoint_kwargs,
+            )
+
+    # === Load the best configuration ===
+    with checkpoint as checkpoint_kwargs:
+        return pipeline(
+            training=training,
+            testing=testing,
+            model='TransH',
+            model_kwargs={'embedding_dim': 50},
+            negative_sampler=OntologyNegativeSampler if use_ontology_sampler else 'basic',
+            negative_sampler_kwargs=negative_sampler_kwargs,
+            training_kwargs={'num_epochs': 100, 'batch_size': batch_size, **checkpoint_kwargs},
+            random_seed=42,
+            device='cpu',
+            **stopping,
+        )
+
+
+def export_embeddings(result, output_dir=output_dir, compression=None):
+    """Write the entity embeddings, both id mappings and the full model to output_dir;
+    with compression="gz"/"zst" the mapping CSVs are written compressed"""
+    import numpy as np
+    import pandas as pd
+    import torch
+    from compressed_io import open_text, with_compression
+
+    # === Extract entity embeddings ===
+    model = result.model
+    entity_embeddings = model.entity_representations[0](indices=None).detach().numpy()
+
+    # === Get entity-to-ID mapping ===
+    entity_to_id = result.training.entity_to_id
+    entity_id_df = pd.DataFrame({
+        "entity": list(entity_to_id.keys()),
+        "id": list(entity_to_id.values())
+    }).sort_values("id")
+    relation_id_df = pd.DataFrame({
+        "relation": list(result.training.relation_to_id.keys()),
+        "id": list(result.training.relation_to_id.values())
+    }).sort_values("id")
+
+    # === Save outputs ===
+    os.makedirs(output_dir, exist_ok=True)
+
+    np.save(os.path.join(output_dir, "entity_embeddings.npy"), entity_embeddings)
+    entity_map_path = with_compression(os.path.join(output_dir, "entity_to_id.csv"), compression)
+    relation_map_path = with_compression(os.path.join(output_dir, "relation_to_id.csv"), compression)
+    with open_text(entity_map_path, "w") as file:
+        entity_id_df.to_csv(file, index=False)
+    with open_text(relation_map_path, "w") as file:
+        relation_id_df.to_csv(file, index=False)
+    # The full model is kept so incremental_embeddings.py can fine-tune instead of retraining
+    torch.save(model, os.path.join(output_dir, "trained_model.pkl"))
+
+    print(f"Saved entity embeddings to {output_dir}/entity_embeddings.npy")
+    print(f"Saved entity-to-id mapping to {entity_map_path}")
+    print(f"Saved relation-to-id mapping to {relation_map_path}")
+    print(f"Saved trained model to {output_dir}/trained_model.pkl")
+
+
+def main(use_ontology_sampler=False, num_workers=1, threads_per_worker=1, batch_size=None,
+         checkpoint_minutes=CHECKPOINT_MINUTES, compression=None):
+    export_embeddings(train_embeddings(use_ontology_sampler=use_ontology_sampler, num_workers=num_workers,
+                                       threads_per_worker=threads_per_worker, batch_size=batch_size,
+                                       checkpoint_minutes=checkpoint_minutes),
+                      compression=compression)
+
+
+if __name__ == "__main__":
+    main()
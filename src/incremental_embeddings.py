@@ -0,0 +1,173 @@
+import os
+import numpy as np
+import pandas as pd
+import torch
+from compressed_io import open_text, read_tsv, resolve, write_tsv
+
+# === Paths and fine-tuning configuration ===
+model_dir = "data/kge/transh_50_5"
+train_path = "data/kge/train.tsv"
+test_path = "data/kge/test.tsv"
+valid_path = "data/kge/valid.tsv"  # written by split --stratified
+all_triples_path = "data/kge/all_triples.tsv"  # re-exported by dreamteam-c1 after a new ingest
+
+num_epochs = 10
+num_negs_per_pos = 5
+warm_start_rounds = 3
+
+
+def read_triples(path):
+    """Read a headerless, optionally compressed TSV of (head, relation, tail) labels"""
+    if not os.path.exists(resolve(path)):
+        return np.empty((0, 3), dtype=str)
+    return read_tsv(path)
+
+
+def read_mapping(path):
+    """Read an entity/relation-to-id CSV written by entity_embeddings.py"""
+    df = pd.read_csv(resolve(path))
+    return dict(zip(df.iloc[:, 0], df.iloc[:, 1].astype(int)))
+
+
+def extend_model(old_model, triples_factory):
+    """Instantiate the same model class over the extended mapping and copy all trained parameters"""
+    new_model = type(old_model)(
+        triples_factory=triples_factory,
+        embedding_dim=old_model.entity_representations[0].shape[0],
+        random_seed=42,
+    )
+    new_state = new_model.state_dict()
+    for key, old_value in old_model.state_dict().items():
+        if new_state[key].shape == old_value.shape:
+            new_state[key] = old_value
+        else:
+            # Entity tables grew: old ids keep their rows, new rows are appended at the end
+            new_state[key][: old_value.shape[0]] = old_value
+    new_model.load_state_dict(new_state)
+    return new_model
+
+
+def warm_start(weight, num_old_entities, neighbour_pairs, rounds=warm_start_rounds):
+    """Initialise new entity rows with the mean of their already-embedded neighbours.
+
+    Repeating the averaging lets entities whose only neighbours are new themselves pick
+    up a value once those neighbours are initialised; anything still isolated keeps the
+    model's default initialisation.
+    """
+    known = torch.zeros(weight.shape[0], dtype=torch.bool)
+    known[:num_old_entities] = True
+    entity, neighbour = neighbour_pairs[:, 0], neighbour_pairs[:, 1]
+
+    with torch.no_grad():
+        for _ in range(rounds):
+            usable = ~known[entity] & known[neighbour]
+            if not usable.any():
+                break
+            sums = torch.zeros_like(weight).index_add_(0, entity[usable], weight[neighbour[usable]])
+            counts = torch.bincount(entity[usable], minlength=weight.shape[0])
+            ready = counts > 0
+            weight[ready] = sums[ready] / counts[ready].unsqueeze(1).to(weight.dtype)
+            known |= ready
+
+
+def update_embeddings(model_dir=model_dir, train_path=train_path, test_path=test_path,
+                      all_triples_path=all_triples_path, num_epochs=num_epochs, valid_path=valid_path):
+    """Fine-tune the saved model on triples that are not yet in train/valid/test and patch the artifacts in place"""
+    from pykeen.training import SLCWATrainingLoop
+    from pykeen.triples import TriplesFactory
+    from parallel_training import prime_optimizer
+
+    # === Step 1: Load the previous model and its mappings ===
+    model_path = os.path.join(model_dir, "trained_model.pkl")
+    if not os.path.exists(model_path):
+        raise SystemExit(f"No trained model at {model_path}; run entity_embeddings.py once for a full training.")
+
+    print(f"Loading previous model from {model_dir}...")
+    old_model = torch.load(model_path, weights_only=False)
+    entity_to_id = read_mapping(os.path.join(model_dir, "entity_to_id.csv"))
+    relation_to_id = read_mapping(os.path.join(model_dir, "relation_to_id.csv"))
+    num_old_entities = len(entity_to_id)
+
+    # === Step 2: Find triples that arrived since the last training run ===
+    known_triples = {tuple(t) for path in (train_path, valid_path, test_path) for t in read_triples(path)}
+    new_triples = np.array([t for t in read_triples(all_triples_path) if tuple(t) not in known_triples], dtype=str)
+    # all_triples.tsv may repeat a line; each new triple is trained on and recorded once
+    new_triples = pd.DataFrame(new_triples.reshape(-1, 3)).drop_duplicates().to_numpy(dtype=str)
+    print(f"Found {len(new_triples)} new triples")
+    if len(new_triples) == 0:
+        raise SystemExit("Nothing to update.")
+
+    unknown_relations = set(new_triples[:, 1]) - set(relation_to_id)
+    if unknown_relations:
+        raise SystemExit(f"New relation types {sorted(unknown_relations)} need a full retraining.")
+
+    # === Step 3: Extend the entity mapping; existing ids never change ===
+    for label in pd.unique(new_triples[:, [0, 2]].ravel()):
+        if label not in entity_to_id:
+            entity_to_id[label] = len(entity_to_id)
+    print(f"Added {len(entity_to_id) - num_old_entities} new entities")
+
+    # === Step 4: Fine-tuning set = new triples + old training triples touching affected entities ===
+    touched = set(new_triples[:, 0]) | set(new_triples[:, 2])
+    old_train = read_triples(train_path)
+    context = old_train[np.isin(old_train[:, 0], list(touched)) | np.isin(old_train[:, 2], list(touched))]
+    affected_triples = np.concatenate([new_triples, context])
+
+    affected_tf = TriplesFactory.from_labeled_triples(
+        affected_triples, entity_to_id=entity_to_id, relation_to_id=relation_to_id
+    )
+    print(f"Fine-tuning on {affected_tf.num_triples} triples ({len(context)} existing context triples)")
+
+    # === Step 5: Grow the embedding tables and warm-start the new rows ===
+    model = extend_model(old_model, affected_tf)
+    new_mapped = TriplesFactory.from_labeled_triples(
+        new_triples, entity_to_id=entity_to_id, relation_to_id=relation_to_id
+    ).mapped_triples
+    neighbour_pairs = torch.cat([new_mapped[:, [0, 2]], new_mapped[:, [2, 0]]])
+    entity_weight = model.entity_representations[0]._embeddings.weight
+    warm_start(entity_weight, num_old_entities, neighbour_pairs)
+
+    # === Step 6: Fine-tune only on the affected triples ===
+    # Rows outside the affected set get no gradient (TransH's weight regularizer would otherwise
+    # touch every entity), so their vectors stay bit-identical and downstream indexes stay valid
+    updated_ids = affected_tf.mapped_triples[:, [0, 2]].unique()
+    trainable_rows = torch.zeros(entity_weight.shape[0], 1)
+    trainable_rows[updated_ids] = 1.0
+    entity_weight.register_hook(lambda grad: grad * trainable_rows)
+
+    optimizer = torch.optim.Adam(params=model.get_grad_params())
+    prime_optimizer(model, optimizer)
+
+    training_loop = SLCWATrainingLoop(
+        model=model,
+        triples_factory=affected_tf,
+        optimizer=optimizer,
+        negative_sampler_kwargs={"num_negs_per_pos": num_negs_per_pos},
+    )
+    training_loop.train(triples_factory=affected_tf, num_epochs=num_epochs, continue_training=True)
+
+    # === Step 7: Save the patched artifacts ===
+    entity_embeddings = model.entity_representations[0](indices=None).detach().numpy()
+    entity_id_df = pd.DataFrame({"entity": list(entity_to_id.keys()), "id": list(entity_to_id.values())}).sort_values("id")
+
+    np.save(os.path.join(model_dir, "entity_embeddings.npy"), entity_embeddings)
+    with open_text(resolve(os.path.join(model_dir, "entity_to_id.csv")), "w") as file:
+        entity_id_df.to_csv(file, index=False)
+    entity_id_df[entity_id_df["id"].isin(updated_ids.tolist())].to_csv(os.path.join(model_dir, "updated_entities.csv"), index=False)
+    torch.save(model, model_path)
+
+    # New triples join the training set so the next incremental run skips them. The training set
+    # is rewritten and swapped in, not appended to, so an interrupted run never leaves a partial
+    # or duplicated tail; it is written last, so a retry after a crash sees the triples as new again
+    train_file = resolve(train_path)
+    tmp_path = os.path.join(os.path.dirname(train_file), ".tmp-" + os.path.basename(train_file))
+    write_tsv(np.concatenate([old_train, new_triples]), tmp_path)
+    os.replace(tmp_path, train_file)
+
+    print(f"Saved updated embeddings for {len(entity_to_id)} entities to {model_dir}/entity_embeddings.npy")
+    print(f"Saved {len(updated_ids)} changed entity ids to {model_dir}/updated_entities.csv")
+    return updated_ids
+
+
+if __name__ == "__main__":
+    update_embeddings()
@@ -0,0 +1,160 @@
+import atexit
+import cProfile
+import json
+import os
+import resource
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+# Instrumentation is switched on per run through the environment, so the scripts keep
+# their plain `python src/<script>.py` usage:
+#   SDM_INSTRUMENT=1 (or a directory)   timed spans, counters and peak RSS as JSON + summary table
+#   SDM_PROFILE=cprofile|tracemalloc    additionally dump a cProfile file / per-span allocation peaks
+OUTPUT_DIR = "data/instrumentation"
+
+_enabled = os.environ.get("SDM_INSTRUMENT", "") not in ("", "0")
+_profile_mode = os.environ.get("SDM_PROFILE", "")
+_spans = []
+_stack = []
+_profiler = None
+
+
+def _peak_rss_mb():
+    """Peak resident set size of this process so far, in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class _NullSpan:
+    """Shared no-op span returned while instrumentation is disabled"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def count(self, name, value=1):
+        pass
+
+    def annotate(self, **values):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """A timed stage with counters; counters are reported as totals and per-second rates"""
+
+    def __init__(self, name):
+        self.name = name
+        self.counters = {}
+        self.annotations = {}
+        self.child_peak = 0
+
+    def __enter__(self):
+        # Records are appended on entry so the report lists stages in start order
+        self.record = {"name": self.name, "parent": _stack[-1].name if _stack else None, "depth": len(_stack)}
+        _spans.append(self.record)
+        _stack.append(self)
+        if _profile_mode == "tracemalloc":
+            tracemalloc.reset_peak()
+        self.start_wall = time.perf_counter()
+        self.start_cpu = time.process_time()
+        return self
+
+    def __exit__(self, *exc):
+        wall = time.perf_counter() - self.start_wall
+        cpu = time.process_time() - self.start_cpu
+        _stack.pop()
+
+        record = self.record
+        record["wall_seconds"] = round(wall, 6)
+        record["cpu_seconds"] = round(cpu, 6)
+        record["peak_rss_mb"] = round(_peak_rss_mb(), 1)
+        record["counters"] = self.counters
+        record["rates"] = {f"{k}_per_sec": round(v / wall, 2) for k, v in self.counters.items() if wall > 0}
+        if _profile_mode == "tracemalloc":
+            # Children reset the tracemalloc peak, so they hand their peak up to the parent
+            peak = max(tracemalloc.get_traced_memory()[1], self.child_peak)
+            if _stack:
+                _stack[-1].child_peak = max(_stack[-1].child_peak, peak)
+            record["peak_traced_mb"] = round(peak / (1024 * 1024), 1)
+        if self.annotations:
+            record["annotations"] = self.annotations
+        return False
+
+    def count(self, name, value=1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def annotate(self, **values):
+        self.annotations.update(values)
+
+
+def span(name):
+    """Time a pipeline stage: `with span("abox.serialize") as stage: ...; stage.count("triples", n)`"""
+    if not _enabled:
+        return _NULL_SPAN
+    return Span(name)
+
+
+def enabled():
+    """Whether SDM_INSTRUMENT is set for this run"""
+    return _enabled
+
+
+def summary_table():
+    """Render the recorded spans as a fixed-width table"""
+    lines = [f"{'stage':<40} {'wall s':>9} {'cpu s':>9} {'peak RSS MB':>12}  rates"]
+    lines.append("-" * len(lines[0]))
+    for record in _spans:
+        if "wall_seconds" not in record:
+            continue  # still open (e.g. report() called from inside a span)
+        rates = ", ".join(f"{k}={v:,.0f}" for k, v in record["rates"].items())
+        name = "  " * record["depth"] + record["name"]
+        lines.append(
+            f"{name:<40} {record['wall_seconds']:>9.3f} {record['cpu_seconds']:>9.3f} "
+            f"{record['peak_rss_mb']:>12.1f}  {rates}"
+        )
+    return "\n".join(lines)
+
+
+def report():
+    """Write the spans as JSON (plus the cProfile dump if requested) and print the summary"""
+    global _profiler
+    if not _enabled or not _spans:
+        return
+
+    setting = os.environ.get("SDM_INSTRUMENT")
+    output_dir = OUTPUT_DIR if setting in ("1", "true", "yes") else setting
+    os.makedirs(output_dir, exist_ok=True)
+    script = os.path.splitext(os.path.basename(sys.argv[0] or "interactive"))[0]
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    output_path = os.path.join(output_dir, f"{script}_{stamp}.json")
+
+    with open(output_path, "w", encoding="utf-8") as file:
+        json.dump({"script": script, "argv": sys.argv[1:], "spans": _spans}, file, indent=2)
+
+    print(f"\n=== INSTRUMENTATION ({script}) ===")
+    print(summary_table())
+    print(f"Spans written to {output_path}")
+
+    if _profiler is not None:
+        _profiler.disable()
+        profile_path = os.path.join(output_dir, f"{script}_{stamp}.prof")
+        _profiler.dump_stats(profile_path)
+        _profiler = None
+        print(f"cProfile stats written to {profile_path} (inspect with `python -m pstats`)")
+
+
+if _enabled:
+    if _profile_mode == "tracemalloc":
+        tracemalloc.start()
+    elif _profile_mode == "cprofile":
+        _profiler = cProfile.Profile()
+        _profiler.enable()
+    atexit.register(report)
@@ -0,0 +1,151 @@
+import math
+from collections import defaultdict
+
+import torch
+from rdflib import URIRef
+from rdflib.namespace import RDF, RDFS
+from pykeen.sampling import BasicNegativeSampler
+
+TBOX_PATH = "data/ontology/dreamteam-b1-AkosSchneider_DinaraKurmangaliyeva.ttl"
+ABOX_PATH = "data/ontology/dreamteam-b2-AkosSchneider_DinaraKurmangaliyeva.ttl"
+
+
+def load_schema(tbox_path=TBOX_PATH):
+    """Read domain/range restrictions and the subclass closure from the TBOX"""
+    from compressed_io import resolve
+    from rdf_snapshot import open_graph
+
+    tbox = open_graph(resolve(tbox_path))
+
+    parents = defaultdict(set)
+    for sub, _, sup in tbox.triples((None, RDFS.subClassOf, None)):
+        parents[sub].add(sup)
+
+    def with_superclasses(cls):
+        closure, stack = {cls}, [cls]
+        while stack:
+            for sup in parents[stack.pop()]:
+                if sup not in closure:
+                    closure.add(sup)
+                    stack.append(sup)
+        return closure
+
+    domains = {p: c for p, _, c in tbox.triples((None, RDFS.domain, None))}
+    ranges = {p: c for p, _, c in tbox.triples((None, RDFS.range, None))}
+    return domains, ranges, with_superclasses
+
+
+def infer_entity_types(domains, ranges, with_superclasses, abox_path=ABOX_PATH):
+    """Materialise RDFS types of ABOX entities (explicit rdf:type plus domain/range entailment);
+    abox_path may be Turtle, .ttl.gz/.zst or an .rdfsnap snapshot"""
+    from compressed_io import resolve
+    from rdf_snapshot import open_graph
+
+    abox = open_graph(resolve(abox_path))
+
+    entity_types = defaultdict(set)
+    for s, p, o in abox:
+        if p == RDF.type and isinstance(o, URIRef):
+            entity_types[str(s)].update(str(c) for c in with_superclasses(o))
+        if p in domains:
+            entity_types[str(s)].update(str(c) for c in with_superclasses(domains[p]))
+        if p in ranges and isinstance(o, URIRef):
+            entity_types[str(o)].update(str(c) for c in with_superclasses(ranges[p]))
+    return entity_types
+
+
+def _to_csr(pools, num_relations):
+    """Pack per-relation id lists into (ptr, values) tensors; a trailing sentinel keeps gathers in bounds"""
+    sizes = torch.tensor([len(pools.get(r, ())) for r in range(num_relations)], dtype=torch.long)
+    ptr = torch.zeros(num_relations + 1, dtype=torch.long)
+    ptr[1:] = torch.cumsum(sizes, dim=0)
+    values = [entity_id for r in range(num_relations) for entity_id in sorted(pools.get(r, ()))]
+    return ptr, torch.tensor(values + [0], dtype=torch.long)
+
+
+def build_candidate_pools(entity_to_id, relation_to_id, tbox_path=TBOX_PATH, abox_path=ABOX_PATH):
+    """Precompute per-relation head (domain) and tail (range) candidate pools as CSR tensors"""
+    domains, ranges, with_superclasses = load_schema(tbox_path)
+    entity_types = infer_entity_types(domains, ranges, with_superclasses, abox_path)
+
+    # Invert the typing once: class URI -> ids of all (training) entities of that class
+    class_members = defaultdict(set)
+    for entity, entity_id in entity_to_id.items():
+        for cls in entity_types.get(entity, ()):
+            class_members[cls].add(entity_id)
+
+    head_pools, tail_pools = {}, {}
+    for relation, relation_id in relation_to_id.items():
+        relation_uri = URIRef(relation)
+        if relation_uri in domains:
+            head_pools[relation_id] = class_members[str(domains[relation_uri])]
+        if relation_uri in ranges:
+            tail_pools[relation_id] = class_members[str(ranges[relation_uri])]
+
+    head_ptr, head_values = _to_csr(head_pools, len(relation_to_id))
+    tail_ptr, tail_values = _to_csr(tail_pools, len(relation_to_id))
+    return {
+        "head_ptr": head_ptr,
+        "head_values": head_values,
+        "tail_ptr": tail_ptr,
+        "tail_values": tail_values,
+    }
+
+
+class OntologyNegativeSampler(BasicNegativeSampler):
+    """Corrupt heads/tails with entities drawn from the relation's domain/range pool.
+
+    ``pool_fraction`` of the corruptions come from the pools; the rest, and every
+    relation without a TBOX restriction (or with fewer than two candidates), fall back
+    to uniform corruption over all entities, exactly like PyKEEN's basic sampler.
+    """
+
+    def __init__(self, *, candidate_pools, pool_fraction=0.5, **kwargs):
+        super().__init__(**kwargs)
+        self.pool_fraction = pool_fraction
+        self.register_buffer("head_ptr", candidate_pools["head_ptr"])
+        self.register_buffer("head_values", candidate_pools["head_values"])
+        self.register_buffer("tail_ptr", candidate_pools["tail_ptr"])
+        self.register_buffer("tail_values", candidate_pools["tail_values"])
+
+    def _replace_from_pool(self, batch, index, selection):
+        if index == 0:
+            ptr, values = self.head_ptr, self.head_values
+        else:
+            ptr, values = self.tail_ptr, self.tail_values
+
+        relations = batch[selection, 1]
+        original = batch[selection, index]
+        offset = ptr[relations]
+        size = ptr[relations + 1] - offset
+        use_pool = (size > 1) & (torch.rand(relations.shape, device=batch.device) < self.pool_fraction)
+
+        # Pooled draw; on a collision with the true entity take its neighbour in the pool
+        draw = (torch.rand(relations.shape, device=batch.device) * size).long()
+        pooled = values[offset + draw]
+        neighbour = values[offset + (draw + 1) % size.clamp(min=1)]
+        pooled = torch.where(pooled == original, neighbour, pooled)
+
+        # Uniform fallback, shifted past the original value as in pykeen's random_replacement_
+        uniform = torch.randint(high=self.num_entities - 1, size=relations.shape, device=batch.device)
+        uniform += (uniform >= original).long()
+
+        batch[selection, index] = torch.where(use_pool, pooled, uniform)
+
+    def corrupt_batch(self, positive_batch):
+        batch_shape = positive_batch.shape[:-1]
+        negative_batch = positive_batch.view(-1, 3).repeat_interleave(self.num_negs_per_pos, dim=0)
+        total_num_negatives = negative_batch.shape[0]
+        split_idx = int(math.ceil(total_num_negatives / len(self._corruption_indices)))
+
+        for index, start in zip(self._corruption_indices, range(0, total_num_negatives, split_idx)):
+            stop = min(start + split_idx, total_num_negatives)
+            if index == 1:
+                # Relation corruption has no ontology pool; keep pykeen's behaviour
+                uniform = torch.randint(high=self.num_relations - 1, size=(stop - start,), device=negative_batch.device)
+                uniform += (uniform >= negative_batch[start:stop, 1]).long()
+                negative_batch[start:stop, 1] = uniform
+            else:
+                self._replace_from_pool(negative_batch, index, slice(start, stop))
+
+        return negative_batch.view(*batch_shape, self.num_negs_per_pos, 3)
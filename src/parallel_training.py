@@ -0,0 +1,185 @@
+import os
+import queue
+import time
+
+import torch
+import torch.multiprocessing as mp
+from pykeen.models import model_resolver
+from pykeen.training import SLCWATrainingLoop
+
+# Data-parallel CPU training by periodic model averaging (local SGD): the training triples are
+# split into one shard per worker process, and every worker trains its own replica of the model
+# with its own Adam optimizer on its shard. After every `sync_epochs` epochs the parent averages
+# the replicas into the shared model, and each worker starts the next round from that average.
+# The embeddings are dense, so the workers never write into each other's tables. One epoch over
+# all shards is one pass over the training set, so epochs/sec scales with the number of workers
+# as long as workers x threads_per_worker does not exceed the physical cores.
+
+
+class ParallelTrainingResult:
+    """The parts of a PyKEEN PipelineResult the scripts use after training"""
+
+    def __init__(self, model, training, losses, train_seconds):
+        self.model = model
+        self.training = training
+        self.losses = losses
+        self.train_seconds = train_seconds
+
+
+def prime_optimizer(model, optimizer):
+    """PyKEEN re-initialises all weights unless it continues from an optimizer that has state;
+    one zero-gradient step creates that state without moving any parameter"""
+    for param in model.get_grad_params():
+        param.grad = torch.zeros_like(param)
+    optimizer.step()
+    optimizer.zero_grad()
+
+
+def checkpoint_path(checkpoint_kwargs):
+    if not checkpoint_kwargs:
+        return None
+    return os.path.join(checkpoint_kwargs["checkpoint_directory"], checkpoint_kwargs["checkpoint_name"])
+
+
+def save_checkpoint(model, epoch, path):
+    torch.save({"model_state_dict": model.state_dict(), "epoch": epoch}, path + ".tmp")
+    os.replace(path + ".tmp", path)
+
+
+@torch.no_grad()
+def average_into(model, replicas):
+    """Overwrite the floating-point state of model with the mean of the replicas' states"""
+    states = [replica.state_dict() for replica in replicas]
+    for name, value in model.state_dict().items():
+        if value.is_floating_point():
+            value.copy_(torch.stack([state[name] for state in states]).mean(dim=0))
+
+
+def _worker(rank, shared_model, model, shard, batch_size, threads_per_worker, learning_rate,
+            negative_sampler, negative_sampler_kwargs, seed, rounds, done):
+    torch.set_num_threads(threads_per_worker)
+    torch.manual_seed(seed + rank)
+
+    optimizer = torch.optim.Adam(params=model.get_grad_params(), lr=learning_rate)
+    prime_optimizer(model, optimizer)
+    training_loop = SLCWATrainingLoop(
+        model=model,
+        triples_factory=shard,
+        optimizer=optimizer,
+        negative_sampler=negative_sampler,
+        negative_sampler_kwargs=negative_sampler_kwargs,
+    )
+    # Each message is the epoch to train up to (PyKEEN counts epochs across train() calls); None stops
+    for num_epochs in iter(rounds.get, None):
+        model.load_state_dict(shared_model.state_dict())
+        losses = training_loop.train(
+            triples_factory=shard,
+            num_epochs=num_epochs,
+            batch_size=batch_size,
+            continue_training=True,
+            use_tqdm=rank == 0,
+            use_tqdm_batch=False,
+        )
+        done.put((rank, list(losses)))
+
+
+def shard_triples(training, num_workers, seed=42):
+    """Split a TriplesFactory into at most `num_workers` random shards that keep the full id
+    mappings; fewer when there are fewer triples than workers"""
+    generator = torch.Generator().manual_seed(seed)
+    permutation = torch.randperm(training.num_triples, generator=generator)
+    return [
+        training.clone_and_exchange_triples(training.mapped_triples[part])
+        for part in permutation.chunk(num_workers)
+    ]
+
+
+def wait_for_round(workers, done):
+    """Losses per rank once every worker has finished the round; raises if a worker died"""
+    losses = {}
+    while len(losses) < len(workers):
+        try:
+            rank, worker_losses = done.get(timeout=5)
+            losses[rank] = worker_losses
+        except queue.Empty:
+            failed = [rank for rank, worker in enumerate(workers) if worker.exitcode not in (None, 0)]
+            if failed:
+                raise RuntimeError(f"Training worker(s) {failed} exited with an error")
+    return losses
+
+
+def train_parallel(training, model="TransH", model_kwargs=None, num_epochs=100, batch_size=256,
+                   num_workers=4, threads_per_worker=1, learning_rate=1e-3, negative_sampler="basic",
+                   negative_sampler_kwargs=None, random_seed=42, start_method="spawn", checkpoint_kwargs=None,
+                   sync_epochs=1):
+    """Train a PyKEEN model in `num_workers` processes whose replicas are averaged every
+    `sync_epochs` epochs; returns a ParallelTrainingResult.
+
+    Every worker holds its own replica, so memory grows with num_workers + 1 model copies.
+    Workers are started with `spawn` by default: forking after torch has started its OpenMP
+    pool can hang the children. `spawn` re-imports the calling script, so it has to keep its
+    work behind an `if __name__ == "__main__":` guard. With checkpoint_kwargs (from
+    training_runtime.checkpointed) the parent saves the averaged model between rounds, and an
+    existing checkpoint is loaded before any worker starts.
+    """
+    torch.manual_seed(random_seed)
+    make = lambda: model_resolver.make(model, triples_factory=training, random_seed=random_seed, **(model_kwargs or {}))  # noqa: E731
+    shared_model = make()
+    path = checkpoint_path(checkpoint_kwargs)
+    start_epoch = 0
+    if path and os.path.exists(path):
+        state = torch.load(path, weights_only=False)
+        shared_model.load_state_dict(state["model_state_dict"])
+        start_epoch = state["epoch"]
+        print(f"Resuming the shared model at epoch {start_epoch}")
+    shards = shard_triples(training, num_workers, random_seed)
+    replicas = [make() for _ in shards]
+    for replica in [shared_model, *replicas]:
+        replica.share_memory()
+    remaining_epochs = max(num_epochs - start_epoch, 0)
+    # Cumulative epoch targets of the rounds; the last round may be shorter
+    targets = [min(epoch, remaining_epochs) for epoch in range(sync_epochs, remaining_epochs + sync_epochs, sync_epochs)]
+
+    context = mp.get_context(start_method)
+    rounds = [context.Queue() for _ in shards]
+    done = context.Queue()
+    workers = [
+        context.Process(
+            target=_worker,
+            args=(rank, shared_model, replica, shard, batch_size, threads_per_worker, learning_rate,
+                  negative_sampler, negative_sampler_kwargs or {}, random_seed, rounds[rank], done),
+        )
+        for rank, (replica, shard) in enumerate(zip(replicas, shards))
+    ]
+    start = time.perf_counter()
+    last_save = time.monotonic()
+    losses = {rank: [] for rank in range(len(workers))}
+    for worker in workers:
+        worker.start()
+    try:
+        for target in targets:
+            for messages in rounds:
+                messages.put(target)
+            losses = wait_for_round(workers, done)
+            average_into(shared_model, replicas)
+            if path and time.monotonic() - last_save >= checkpoint_kwargs["checkpoint_frequency"] * 60:
+                save_checkpoint(shared_model, start_epoch + target, path)
+                last_save = time.monotonic()
+        for messages in rounds:
+            messages.put(None)
+        for worker in workers:
+            worker.join()
+    finally:
+        for worker in workers:
+            if worker.is_alive():
+                worker.terminate()
+    train_seconds = time.perf_counter() - start
+
+    # Mean loss per epoch across workers
+    per_epoch = list(zip(*losses.values()))
+    return ParallelTrainingResult(
+        model=shared_model,
+        training=training,
+        losses=[sum(epoch) / len(epoch) for epoch in per_epoch],
+        train_seconds=train_seconds,
+    )
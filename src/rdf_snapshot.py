@@ -0,0 +1,378 @@
+import bisect
+import json
+import mmap
+import os
+import struct
+import zlib
+from functools import lru_cache
+
+from rdflib import BNode, Literal, URIRef
+
+# Binary RDF snapshot, laid out after HDT: a dictionary maps every term to an integer id,
+# and the triples are stored as bit-packed id arrays with two indexes
+#   SPO  triples sorted by (s, p, o); s_ptr[s]:s_ptr[s + 1] is the range of subject s, and
+#        p holds an index into the short list of predicate ids so it packs into a few bits
+#   OPS  positions into SPO sorted by (o, p, s); o_ptr[o]:o_ptr[o + 1] is the range of object o
+# The dictionary is front-coded in blocks of BLOCK_SIZE sorted terms (each term stores the
+# length of the prefix it shares with the previous one and the rest), and each block is zlib
+# compressed. The file is memory-mapped and queried in place: a pattern lookup only touches the
+# index ranges and the dictionary blocks it needs, nothing is parsed up front. numpy is imported
+# on first use, so importing this module for open_graph() on Turtle stays cheap.
+#
+# File layout: MAGIC, uint64 header length, JSON header, then 8-byte aligned sections.
+MAGIC = b"SDMSNAP2"
+EXTENSION = ".rdfsnap"
+BLOCK_SIZE = 128  # terms per compressed dictionary block
+
+# Terms are stored as a kind prefix plus payload. The prefixes sort literals < URIs < blank
+# nodes, so each kind is one contiguous id range.
+_LITERAL, _URI, _BNODE = "\"", "<", "_"
+
+
+def is_snapshot(path):
+    return str(path).endswith(EXTENSION)
+
+
+def encode_term(term):
+    if isinstance(term, URIRef):
+        return _URI + str(term)
+    if isinstance(term, BNode):
+        return _BNODE + str(term)
+    # Literal: lexical form, NUL, then "@lang", the datatype URI or nothing
+    suffix = "@" + term.language if term.language else str(term.datatype or "")
+    return _LITERAL + str(term) + "\x00" + suffix
+
+
+def decode_term(key):
+    kind, payload = key[0], key[1:]
+    if kind == _URI:
+        return URIRef(payload)
+    if kind == _BNODE:
+        return BNode(payload)
+    lexical, _, suffix = payload.rpartition("\x00")
+    if suffix.startswith("@"):
+        return Literal(lexical, lang=suffix[1:])
+    return Literal(lexical, datatype=URIRef(suffix) if suffix else None)
+
+
+def _bit_width(max_value):
+    return max(int(max_value).bit_length(), 1)
+
+
+def pack(values, width):
+    """Pack non-negative integers into `width` bits each, as little-endian uint32 words"""
+    import numpy as np
+
+    values = np.asarray(values, dtype=np.uint64)
+    bits = ((values[:, None] >> np.arange(width, dtype=np.uint64)) & 1).astype(np.uint8).ravel()
+    # One spare word so unpack() can always read the word after the one an entry starts in
+    padded = np.zeros((len(bits) + 31) // 32 * 32 + 32, dtype=np.uint8)
+    padded[: len(bits)] = bits
+    return np.packbits(padded, bitorder="little").view("<u4")
+
+
+def unpack(words, width, index):
+    """Read entries `index` (int or array) of a packed array; only the touched words are read"""
+    import numpy as np
+
+    bit = np.asarray(index, dtype=np.uint64) * np.uint64(width)
+    word = bit >> np.uint64(5)
+    pair = words[word].astype(np.uint64) | (words[word + np.uint64(1)].astype(np.uint64) << np.uint64(32))
+    return ((pair >> (bit & np.uint64(31))) & np.uint64((1 << width) - 1)).astype(np.int64)
+
+
+def _varint(value):
+    out = bytearray()
+    while value > 0x7F:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _read_varint(data, position):
+    value, shift = 0, 0
+    while True:
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, position
+        shift += 7
+
+
+def _front_code(keys):
+    """Front-code sorted keys: per key a varint shared-prefix length, a varint suffix length and
+    the UTF-8 suffix; the first key of a block is stored whole"""
+    parts, previous = [], b""
+    for key in keys:
+        encoded = key.encode("utf-8")
+        shared = len(os.path.commonprefix([previous, encoded]))
+        parts.append(_varint(shared) + _varint(len(encoded) - shared) + encoded[shared:])
+        previous = encoded
+    return b"".join(parts)
+
+
+def _front_decode(raw, count):
+    keys, previous, position = [], b"", 0
+    for _ in range(count):
+        shared, position = _read_varint(raw, position)
+        length, position = _read_varint(raw, position)
+        previous = previous[:shared] + raw[position:position + length]
+        position += length
+        keys.append(previous.decode("utf-8"))
+    return keys
+
+
+def _dictionary_blocks(keys):
+    """Front-code and compress the sorted term keys in blocks of BLOCK_SIZE"""
+    import numpy as np
+
+    offsets, blobs, position = [0], [], 0
+    for start in range(0, len(keys), BLOCK_SIZE):
+        blob = zlib.compress(_front_code(keys[start:start + BLOCK_SIZE]), 9)
+        blobs.append(blob)
+        position += len(blob)
+        offsets.append(position)
+    return np.array(offsets, dtype="<u8"), b"".join(blobs)
+
+
+def write_snapshot(graph, path):
+    """Dictionary-encode an rdflib graph and write it as a snapshot file; returns the file size"""
+    import numpy as np
+
+    keys = sorted({encode_term(term) for triple in graph for term in triple})
+    term_id = {key: i for i, key in enumerate(keys)}
+    num_terms = len(keys)
+
+    ids = np.array([[term_id[encode_term(t)] for t in triple] for triple in graph], dtype=np.int64).reshape(-1, 3)
+    s, p, o = ids[np.lexsort((ids[:, 2], ids[:, 1], ids[:, 0]))].T
+    ops = np.lexsort((s, p, o))
+    predicates, p_local = np.unique(p, return_inverse=True)
+    s_ptr = np.concatenate([[0], np.cumsum(np.bincount(s, minlength=num_terms))])
+    o_ptr = np.concatenate([[0], np.cumsum(np.bincount(o, minlength=num_terms))])
+
+    kinds = {}
+    for name, prefix in (("literal", _LITERAL), ("uri", _URI), ("bnode", _BNODE)):
+        kinds[name] = bisect.bisect_left(keys, prefix)
+    dict_offsets, dict_data = _dictionary_blocks(keys)
+
+    id_width = _bit_width(max(num_terms - 1, 0))
+    predicate_width = _bit_width(max(len(predicates) - 1, 0))
+    position_width = _bit_width(max(len(s), 1))
+    sections = {
+        "dict_offsets": (dict_offsets.tobytes(), None),
+        "dict_data": (dict_data, None),
+        "predicates": (predicates.astype("<u4").tobytes(), None),
+        "s_ptr": (pack(s_ptr, position_width).tobytes(), position_width),
+        "p": (pack(p_local, predicate_width).tobytes(), predicate_width),
+        "o": (pack(o, id_width).tobytes(), id_width),
+        "o_ptr": (pack(o_ptr, position_width).tobytes(), position_width),
+        "ops": (pack(ops, position_width).tobytes(), position_width),
+    }
+
+    header = {
+        "num_triples": int(len(s)),
+        "num_terms": num_terms,
+        "block_size": BLOCK_SIZE,
+        "kind_starts": kinds,
+        "sections": {},
+    }
+    # Section offsets depend on the header length, so lay them out relative to the data start
+    offset = 0
+    for name, (data, width) in sections.items():
+        header["sections"][name] = {"offset": offset, "length": len(data), "width": width}
+        offset += (len(data) + 7) // 8 * 8
+
+    header_bytes = json.dumps(header).encode("utf-8")
+    data_start = (len(MAGIC) + 8 + len(header_bytes) + 7) // 8 * 8
+    with open(path, "wb") as file:
+        file.write(MAGIC + struct.pack("<Q", len(header_bytes)) + header_bytes)
+        file.write(b"\x00" * (data_start - file.tell()))
+        for name, (data, _) in sections.items():
+            file.write(data + b"\x00" * ((len(data) + 7) // 8 * 8 - len(data)))
+        return file.tell()
+
+
+class Snapshot:
+    """Read-only, memory-mapped snapshot with the subset of the rdflib Graph API the scripts use"""
+
+    def __init__(self, path):
+        import numpy as np
+
+        self.path = str(path)
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[: len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not an RDF snapshot in the current format; rebuild it with dreamteam-b2")
+        (header_length,) = struct.unpack_from("<Q", self._mmap, len(MAGIC))
+        header_end = len(MAGIC) + 8 + header_length
+        self.header = json.loads(self._mmap[len(MAGIC) + 8: header_end])
+        self._data_start = (header_end + 7) // 8 * 8
+        self.num_terms = self.header["num_terms"]
+        self.num_triples = self.header["num_triples"]
+
+        starts = self.header["kind_starts"]
+        self._uri_range = (starts["uri"], starts["bnode"])
+        self._dict_offsets = self._section("dict_offsets", "<u8")
+        self._predicates = self._section("predicates", "<u4").astype(np.int64)
+        self._columns = {name: self._section(name, "<u4") for name in ("s_ptr", "p", "o", "o_ptr", "ops")}
+        self._block = lru_cache(maxsize=256)(self._read_block)
+        self._subjects = None
+
+    # === Low-level access ===
+
+    def _section(self, name, dtype):
+        import numpy as np
+
+        section = self.header["sections"][name]
+        return np.frombuffer(self._mmap, dtype=dtype, count=section["length"] // np.dtype(dtype).itemsize,
+                             offset=self._data_start + section["offset"])
+
+    def _get(self, name, index):
+        return unpack(self._columns[name], self.header["sections"][name]["width"], index)
+
+    def _read_block(self, block):
+        section = self.header["sections"]["dict_data"]
+        start = self._data_start + section["offset"] + int(self._dict_offsets[block])
+        end = self._data_start + section["offset"] + int(self._dict_offsets[block + 1])
+        count = min(BLOCK_SIZE, self.num_terms - block * BLOCK_SIZE)
+        return _front_decode(zlib.decompress(self._mmap[start:end]), count)
+
+    def _subject_column(self):
+        """Subject id of every SPO position, expanded from s_ptr on first use"""
+        import numpy as np
+
+        if self._subjects is None:
+            s_ptr = self._get("s_ptr", np.arange(self.num_terms + 1))
+            self._subjects = np.repeat(np.arange(self.num_terms), np.diff(s_ptr))
+        return self._subjects
+
+    # === Dictionary ===
+
+    def key(self, term_id):
+        return self._block(term_id // BLOCK_SIZE)[term_id % BLOCK_SIZE]
+
+    def term(self, term_id):
+        return decode_term(self.key(int(term_id)))
+
+    def lookup(self, term):
+        """Id of an rdflib term, or None if the snapshot does not contain it"""
+        key = encode_term(term)
+        low, high = 0, (self.num_terms + BLOCK_SIZE - 1) // BLOCK_SIZE
+        while low < high:
+            middle = (low + high) // 2
+            if self._block(middle)[0] <= key:
+                low = middle + 1
+            else:
+                high = middle
+        if low == 0:
+            return None
+        keys = self._block(low - 1)
+        position = bisect.bisect_left(keys, key)
+        if position < len(keys) and keys[position] == key:
+            return (low - 1) * BLOCK_SIZE + position
+        return None
+
+    def is_uri(self, term_ids):
+        low, high = self._uri_range
+        return (term_ids >= low) & (term_ids < high)
+
+    # === Triple patterns on ids ===
+
+    def triple_ids(self, s=None, p=None, o=None):
+        """(n, 3) array of (s, p, o) ids matching the pattern; None is a wildcard"""
+        import numpy as np
+
+        if s is not None:
+            start, end = self._get("s_ptr", [s, s + 1])
+            positions = np.arange(start, end)
+            subjects = np.full(len(positions), s, dtype=np.int64)
+        elif o is not None:
+            start, end = self._get("o_ptr", [o, o + 1])
+            positions = np.sort(self._get("ops", np.arange(start, end)))
+            subjects = self._subject_column()[positions]
+        else:
+            positions = np.arange(self.num_triples)
+            subjects = self._subject_column()
+
+        predicates = self._predicates[self._get("p", positions)]
+        objects = self._get("o", positions)
+        keep = np.ones(len(positions), dtype=bool)
+        if p is not None:
+            keep &= predicates == p
+        if o is not None:
+            keep &= objects == o
+        return np.stack([subjects[keep], predicates[keep], objects[keep]], axis=1)
+
+    # === rdflib Graph compatible API ===
+
+    def triples(self, pattern):
+        bound = []
+        for term in pattern:
+            if term is None:
+                bound.append(None)
+                continue
+            term_id = self.lookup(term)
+            if term_id is None:
+                return
+            bound.append(term_id)
+        for s, p, o in self.triple_ids(*bound):
+            yield self.term(s), self.term(p), self.term(o)
+
+    def subjects(self, predicate=None, object=None):
+        for s, _, _ in self.triples((None, predicate, object)):
+            yield s
+
+    def objects(self, subject=None, predicate=None):
+        for _, _, o in self.triples((subject, predicate, None)):
+            yield o
+
+    def __iter__(self):
+        return self.triples((None, None, None))
+
+    def __len__(self):
+        return self.num_triples
+
+    def __contains__(self, triple):
+        return next(self.triples(triple), None) is not None
+
+    def uri_triples(self):
+        """All (s, p, o) label triples whose subject and object are URIs, decoding each term once"""
+        import numpy as np
+
+        ids = self.triple_ids()
+        ids = ids[self.is_uri(ids[:, 0]) & self.is_uri(ids[:, 2])]
+        used = np.unique(ids)
+        labels = dict(zip(used.tolist(), (str(self.term(i)) for i in used)))
+        return [(labels[s], labels[p], labels[o]) for s, p, o in ids.tolist()]
+
+    def close(self):
+        self._block.cache_clear()
+        self._columns = self._dict_offsets = self._subjects = None
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def open_graph(path, format="turtle"):
+    """Open a snapshot in place, or parse any other (optionally .gz/.zst) RDF file into an rdflib Graph"""
+    if is_snapshot(path):
+        return Snapshot(path)
+    from rdflib import Graph
+    from compressed_io import compression_of, open_binary, resolve
+
+    graph = Graph()
+    path = resolve(path)
+    if compression_of(path):
+        with open_binary(path) as file:
+            graph.parse(file, format=format)
+    else:
+        graph.parse(path, format=format)
+    return graph
@@ -0,0 +1,121 @@
+import os
+
+import numpy as np
+import scipy.sparse as sp
+from check_csv_integrity import stream_columns
+from instrumentation import span
+
+DATA_DIR = "data/assignment1"
+OUTPUT_PATH = "data/reviews/review_conflicts.csv"
+PUB_NS = "http://example.org/publication-ontology#"
+
+# reviews_rel.csv refers to papers as pub_<paper id> while write_rel.csv uses the bare id
+# (see check_csv_integrity.py); review targets are matched on the bare id.
+REVIEW_PAPER_PREFIX = "pub_"
+
+
+def clean_id(id_str):
+    """The URI-safe id the ABOX builder mints (create_uri in dreamteam-b2)"""
+    return id_str.replace("/", "_").replace(" ", "_").replace(":", "_")
+
+
+def read_edges(path):
+    """(:START_ID, :END_ID) columns of a relationship file as two object arrays"""
+    starts, ends = [], []
+    for chunk_starts, chunk_ends in stream_columns(path, [":START_ID", ":END_ID"]):
+        starts.extend(chunk_starts)
+        ends.extend(chunk_ends)
+    return np.array(starts, dtype=object), np.array(ends, dtype=object)
+
+
+def incidence(rows, cols, shape):
+    """Binary sparse matrix with a one at every (row, col); duplicate edges count once"""
+    matrix = sp.csr_matrix((np.ones(len(rows), dtype=np.int32), (rows, cols)), shape=shape)
+    matrix.data[:] = 1
+    return matrix
+
+
+def find_conflicts(write_authors, write_papers, reviewers, reviewed_papers):
+    """Flag review assignments whose reviewer is, or has co-authored with, an author of the paper.
+
+    A is the author x paper incidence matrix from write_rel and C = A A^T the co-authorship
+    projection (C[i, j] = number of papers authors i and j wrote together). For assignment (r, p) the reviewer's
+    co-author row C[r] and the paper's author column A[:, p] overlap exactly when r co-authored
+    with one of p's authors, so all assignments are checked with one row gather and one
+    elementwise sparse product. Returns a list of conflict dicts.
+    """
+    import pandas as pd
+
+    # Hash-based factorisation; np.unique sorts the id strings, which is several times slower
+    author_codes, authors = pd.factorize(np.concatenate([write_authors, reviewers]))
+    paper_codes, papers = pd.factorize(np.concatenate([write_papers, reviewed_papers]))
+    n_writes = len(write_authors)
+    write_a, review_a = author_codes[:n_writes], author_codes[n_writes:]
+    write_p, review_p = paper_codes[:n_writes], paper_codes[n_writes:]
+
+    with span("conflicts.incidence") as stage:
+        A = incidence(write_a, write_p, (len(authors), len(papers)))
+        stage.count("edges", A.nnz)
+
+    with span("conflicts.coauthorship") as stage:
+        C = (A @ A.T).tocsr()
+        C.setdiag(0)
+        C.eliminate_zeros()
+        stage.count("pairs", C.nnz)
+
+    with span("conflicts.join") as stage:
+        own = np.asarray(A[review_a, review_p]).ravel() > 0
+        paper_authors = A.T.tocsr()[review_p]
+        shared = C[review_a].multiply(paper_authors).tocsr()
+        stage.count("assignments", len(review_a))
+
+    conflicts = []
+    for i in np.flatnonzero(own | (np.diff(shared.indptr) > 0)):
+        row = shared[i]
+        coauthors = authors[row.indices[np.argsort(-row.data)]]
+        conflicts.append({
+            "reviewer": authors[review_a[i]],
+            "paper": papers[review_p[i]],
+            "conflict": "author" if own[i] else "coauthor",
+            "coauthors": ";".join(coauthors),
+            "shared_papers": int(row.data.sum()),
+        })
+    return conflicts
+
+
+def write_triples(conflicts, path):
+    """Flags as N-Triples: paper pub:hasConflictingReviewer reviewer"""
+    with open(path, "w", encoding="utf-8") as file:
+        for conflict in conflicts:
+            file.write(f"<{PUB_NS}paper_{clean_id(conflict['paper'])}> <{PUB_NS}hasConflictingReviewer> "
+                       f"<{PUB_NS}{clean_id(conflict['reviewer'])}> .\n")
+
+
+def main(data_dir=DATA_DIR, output_path=OUTPUT_PATH, triples_path=None):
+    import pandas as pd
+
+    with span("conflicts.load") as stage:
+        write_authors, write_papers = read_edges(f"{data_dir}/relationships/write_rel.csv")
+        reviewers, reviewed_papers = read_edges(f"{data_dir}/relationships/reviews_rel.csv")
+        known_papers = set(write_papers)
+        reviewed_papers = np.array([
+            p.removeprefix(REVIEW_PAPER_PREFIX) if p not in known_papers else p for p in reviewed_papers
+        ], dtype=object)
+        stage.count("edges", len(write_authors) + len(reviewers))
+
+    conflicts = find_conflicts(write_authors, write_papers, reviewers, reviewed_papers)
+
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    columns = ["reviewer", "paper", "conflict", "coauthors", "shared_papers"]
+    pd.DataFrame(conflicts, columns=columns).to_csv(output_path, index=False)
+    own = sum(c["conflict"] == "author" for c in conflicts)
+    print(f"{len(reviewers)} review assignments checked against {len(write_authors)} authorship edges: "
+          f"{own} reviewers author the paper, {len(conflicts) - own} co-authored with an author")
+    print(f"Saved conflict report to {output_path}")
+    if triples_path:
+        write_triples(conflicts, triples_path)
+        print(f"Saved {len(conflicts)} hasConflictingReviewer triples to {triples_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+import os
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from rdflib import Namespace
+from compressed_io import resolve
+from instrumentation import span
+
+PUB = Namespace("http://example.org/publication-ontology#")
+
+# === Paths and scoring configuration ===
+abox_path = "data/ontology/dreamteam-b2-AkosSchneider_DinaraKurmangaliyeva.ttl"
+embedding_path = "data/kge/transh_50_5/entity_embeddings.npy"
+entity_map_path = "data/kge/transh_50_5/entity_to_id.csv"
+output_path = "data/reviews/reviewer_recommendations.csv"
+
+top_k = 3              # reviewers recommended per paper
+max_load = 5           # reviews per reviewer, counting the reviews already in the ABOX
+topic_weight = 0.5     # weight of the topic overlap next to the embedding cosine similarity
+pool_size = 50         # candidates kept per paper for the load-capped assignment
+chunk_cells = 8_000_000  # paper x reviewer scores per matrix product (32 MB of float32)
+
+# The builder mints reviewed papers as paper_pub_<id> (reviews_rel.csv prefixes the ids with
+# pub_), while authorship and topics hang off paper_<id>; reviews are matched on paper_<id>.
+REVIEWED_PREFIX = "paper_pub_"
+COLUMNS = ["paper", "rank", "reviewer", "score", "similarity", "topic_overlap"]
+
+# research_papers.csv also holds placeholder rows minted per author and edition ("Research by
+# <author> at <venue> <year>", ids paper_author_...). They have an author but no topic, no
+# citation and no review, so they would make up every "unreviewed paper" and could only be
+# matched on embedding noise. Only papers with at least one hasTopic are candidates.
+
+
+def local_name(uri):
+    return str(uri).rsplit("#", 1)[-1]
+
+
+def paper_key(uri):
+    name = local_name(uri)
+    return "paper_" + name.removeprefix(REVIEWED_PREFIX) if name.startswith(REVIEWED_PREFIX) else name
+
+
+def load_structure(g):
+    """Authorship pairs, topic pairs, reviewed paper keys and existing reviews per reviewer"""
+    authorship = [(local_name(p), local_name(a)) for p, _, a in g.triples((None, PUB.hasAuthor, None))]
+    topics = [(local_name(p), local_name(t)) for p, _, t in g.triples((None, PUB.hasTopic, None))]
+    reviewed = set()
+    load = {}
+    for paper, _, review in g.triples((None, PUB.hasReview, None)):
+        reviewed.add(paper_key(paper))
+        for _, _, reviewer in g.triples((review, PUB.writtenBy, None)):
+            load[local_name(reviewer)] = load.get(local_name(reviewer), 0) + 1
+    return authorship, topics, reviewed, load
+
+
+def incidence(pairs, row_index, col_index):
+    """Binary sparse matrix over the pairs whose endpoints are both indexed"""
+    rows, cols = [], []
+    for a, b in pairs:
+        if a in row_index and b in col_index:
+            rows.append(row_index[a])
+            cols.append(col_index[b])
+    matrix = sp.csr_matrix((np.ones(len(rows), dtype=np.float32), (rows, cols)),
+                           shape=(len(row_index), len(col_index)))
+    matrix.data[:] = 1
+    return matrix
+
+
+def normalized_rows(vectors):
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+def score_candidates(paper_vectors, reviewer_vectors, paper_topics, reviewer_topics, excluded,
+                     topic_weight=topic_weight, pool_size=pool_size, chunk_cells=chunk_cells):
+    """Best `pool_size` (paper row, reviewer row, score, similarity, overlap) per paper.
+
+    score = cosine(paper, reviewer) + topic_weight * overlap, where overlap is the fraction of
+    the paper's topics the reviewer has published on. Both terms are matrix products over a
+    chunk of papers; excluded (paper, reviewer) pairs are set to -inf before the top-k.
+    """
+    topic_counts = np.maximum(np.asarray(paper_topics.sum(axis=1)).ravel(), 1)
+    pool = min(pool_size, reviewer_vectors.shape[0])
+    chunk_rows = max(1, chunk_cells // reviewer_vectors.shape[0])
+    candidates = []
+    for start in range(0, len(paper_vectors), chunk_rows):
+        end = min(start + chunk_rows, len(paper_vectors))
+        similarity = paper_vectors[start:end] @ reviewer_vectors.T
+        overlap = (paper_topics[start:end] @ reviewer_topics.T).toarray() / topic_counts[start:end, None]
+        scores = similarity + topic_weight * overlap
+        blocked = excluded[start:end].tocoo()
+        scores[blocked.row, blocked.col] = -np.inf
+
+        best = np.argpartition(-scores, pool - 1, axis=1)[:, :pool]
+        best_scores = np.take_along_axis(scores, best, axis=1)
+        rows = np.repeat(np.arange(start, end), pool)
+        keep = np.isfinite(best_scores).ravel()
+        cols = best.ravel()[keep]
+        candidates.append(pd.DataFrame({
+            "paper_row": rows[keep],
+            "reviewer_row": cols,
+            "score": best_scores.ravel()[keep],
+            "similarity": similarity[rows[keep] - start, cols],
+            "topic_overlap": overlap[rows[keep] - start, cols],
+        }))
+    return pd.concat(candidates, ignore_index=True)
+
+
+def assign(candidates, initial_load, top_k=top_k, max_load=max_load):
+    """Greedy load-capped assignment: highest scores first, at most top_k reviewers per paper
+    and max_load reviews per reviewer including initial_load"""
+    candidates = candidates.sort_values("score", ascending=False, kind="stable")
+    load = initial_load.copy()
+    per_paper = {}
+    chosen = []
+    for index, paper, reviewer in zip(candidates.index, candidates["paper_row"].values, candidates["reviewer_row"].values):
+        if per_paper.get(paper, 0) >= top_k or load[reviewer] >= max_load:
+            continue
+        per_paper[paper] = per_paper.get(paper, 0) + 1
+        load[reviewer] += 1
+        chosen.append(index)
+    result = candidates.loc[chosen].copy()
+    result["rank"] = result.groupby("paper_row").cumcount() + 1
+    return result
+
+
+def recommend(g, embedding_path=embedding_path, entity_map_path=entity_map_path, top_k=top_k,
+              max_load=max_load, topic_weight=topic_weight, exclude_coauthors=True):
+    """Top-k reviewer recommendations for every paper with topics and without a review, as a DataFrame"""
+    with span("recommend.load") as stage:
+        embeddings = np.load(resolve(embedding_path))
+        entity_df = pd.read_csv(resolve(entity_map_path))
+        names = entity_df["entity"].str.rsplit("#", n=1).str[-1]
+        ids = dict(zip(names, entity_df["id"]))
+        authorship, topic_pairs, reviewed, existing_load = load_structure(g)
+        stage.count("authorship", len(authorship))
+
+    # Every author with an embedding can review; papers are the authored ones with topics and no review yet
+    reviewers = sorted(n for n in ids if n.startswith("author_"))
+    unreviewed = {p for p, _ in authorship} - reviewed
+    papers = sorted(unreviewed & {p for p, _ in topic_pairs})
+    skipped = len(unreviewed) - len(papers)
+    papers = [p for p in papers if p in ids]
+    reviewer_index = {name: i for i, name in enumerate(reviewers)}
+    topic_index = {t: i for i, t in enumerate(sorted({t for _, t in topic_pairs}))}
+    print(f"{len(papers)} unreviewed papers, {len(reviewers)} candidate reviewers "
+          f"({skipped} unreviewed nodes without topics skipped as placeholders)")
+    if not papers:
+        return pd.DataFrame(columns=COLUMNS)
+
+    with span("recommend.matrices") as stage:
+        paper_vectors = normalized_rows(embeddings[[ids[p] for p in papers]].astype(np.float32))
+        reviewer_vectors = normalized_rows(embeddings[[ids[r] for r in reviewers]].astype(np.float32))
+
+        all_papers = {p: i for i, p in enumerate(sorted({p for p, _ in authorship} | {p for p, _ in topic_pairs}))}
+        authors = incidence(((a, p) for p, a in authorship), reviewer_index, all_papers)
+        topics = incidence(topic_pairs, all_papers, topic_index)
+        reviewer_topics = authors @ topics
+        reviewer_topics.data[:] = 1
+        rows = [all_papers[p] for p in papers]
+        paper_topics = topics[rows]
+
+        # Hard constraints: a paper's own authors, and with exclude_coauthors their co-authors too
+        excluded = authors[:, rows].T.tocsr()
+        if exclude_coauthors:
+            excluded = excluded + excluded @ (authors @ authors.T)
+        stage.count("papers", len(papers))
+
+    with span("recommend.score") as stage:
+        candidates = score_candidates(paper_vectors, reviewer_vectors, paper_topics, reviewer_topics,
+                                      excluded, topic_weight)
+        stage.count("candidates", len(candidates))
+
+    with span("recommend.assign") as stage:
+        initial_load = np.array([existing_load.get(r, 0) for r in reviewers])
+        result = assign(candidates, initial_load, top_k, max_load)
+        stage.count("recommendations", len(result))
+
+    result["paper"] = [str(PUB[papers[i]]) for i in result["paper_row"]]
+    result["reviewer"] = [str(PUB[reviewers[i]]) for i in result["reviewer_row"]]
+    short = len(papers) - int((result.groupby("paper_row").size() == top_k).sum())
+    if short:
+        print(f"{short} papers got fewer than {top_k} reviewers (load cap or constraints)")
+    return result.sort_values(["paper", "rank"])[COLUMNS].round(4)
+
+
+def main(abox_path=abox_path, output_path=output_path, top_k=top_k, max_load=max_load):
+    from rdf_snapshot import open_graph
+
+    result = recommend(open_graph(abox_path), top_k=top_k, max_load=max_load)
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    result.to_csv(output_path, index=False)
+    print(f"Saved {len(result)} reviewer recommendations to {output_path}")
+
+
+if __name__ == "__main__":
+    main()
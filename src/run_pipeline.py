@@ -0,0 +1,311 @@
+import argparse
+import ast
+import glob
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from compressed_io import glob_data, resolve
+from instrumentation import span
+
+# === Stage declarations ===
+# Every stage is one of the existing scripts, run from the repository root. A stage is
+# skipped when the content hashes of its inputs (script included) match the last
+# successful run and its outputs are still on disk unchanged. Dependencies are derived
+# from the paths: a stage depends on whichever stage produces one of its inputs.
+TBOX = "data/ontology/dreamteam-b1-AkosSchneider_DinaraKurmangaliyeva.ttl"
+ABOX = "data/ontology/dreamteam-b2-AkosSchneider_DinaraKurmangaliyeva.ttl"
+CSV_INPUTS = ["data/assignment1/nodes/*.csv", "data/assignment1/relationships/*.csv"]
+KGE_DIR = "data/kge"
+EMBEDDING_DIR = "data/kge/transh_50_5"
+SEARCH_INDEX_DIR = "data/search/text_index"
+EGO_INDEX_DIR = "data/search/ego_index"
+
+STAGES = [
+    {
+        "name": "tbox",
+        "script": "src/dreamteam-b1-AkosSchneider_DinaraKurmangaliyeva.py",
+        "inputs": [],
+        "outputs": [TBOX],
+    },
+    {
+        "name": "integrity",
+        "script": "src/check_csv_integrity.py",
+        "inputs": CSV_INPUTS,
+        "outputs": [],
+    },
+    {
+        "name": "conflicts",
+        "script": "src/review_conflicts.py",
+        "inputs": ["data/assignment1/relationships/write_rel.csv", "data/assignment1/relationships/reviews_rel.csv"],
+        "outputs": ["data/reviews/review_conflicts.csv"],
+    },
+    {
+        "name": "abox",
+        "script": "src/dreamteam-b2-AkosSchneider_DinaraKurmangaliyeva.py",
+        "inputs": [TBOX] + CSV_INPUTS,
+        "outputs": [ABOX],
+    },
+    {
+        "name": "validate",
+        "script": "src/validate_abox.py",
+        "inputs": [ABOX],
+        "outputs": [],
+    },
+    {
+        "name": "search_index",
+        "script": "src/text_index.py",
+        "inputs": [ABOX],
+        "outputs": [f"{SEARCH_INDEX_DIR}/meta.json", f"{SEARCH_INDEX_DIR}/postings_doc.npy"],
+    },
+    {
+        "name": "ego_index",
+        "script": "src/ego_network.py",
+        "inputs": [ABOX],
+        "outputs": [f"{EGO_INDEX_DIR}/entities.json", f"{EGO_INDEX_DIR}/out_ptr.npy", f"{EGO_INDEX_DIR}/in_ptr.npy"],
+    },
+    {
+        "name": "split",
+        "script": "src/dreamteam-c1-AkosSchneider_DinaraKurmangaliyeva.py",
+        "inputs": [ABOX],
+        "outputs": [f"{KGE_DIR}/all_triples.tsv", f"{KGE_DIR}/train.tsv", f"{KGE_DIR}/valid.tsv", f"{KGE_DIR}/test.tsv"],
+    },
+    {
+        "name": "sweep",
+        "script": "src/dreamteam-c3-AkosSchneider_DinaraKurmangaliyeva.py",
+        "inputs": [f"{KGE_DIR}/train.tsv", f"{KGE_DIR}/valid.tsv", f"{KGE_DIR}/test.tsv", TBOX, ABOX],
+        "outputs": [f"{KGE_DIR}/kge_model_comparison.csv"],
+    },
+    {
+        "name": "embeddings",
+        "script": "src/entity_embeddings.py",
+        "inputs": [f"{KGE_DIR}/train.tsv", f"{KGE_DIR}/valid.tsv", f"{KGE_DIR}/test.tsv", TBOX, ABOX],
+        "outputs": [
+            f"{EMBEDDING_DIR}/entity_embeddings.npy",
+            f"{EMBEDDING_DIR}/entity_to_id.csv",
+            f"{EMBEDDING_DIR}/relation_to_id.csv",
+            f"{EMBEDDING_DIR}/trained_model.pkl",
+        ],
+    },
+    {
+        "name": "cluster",
+        "script": "src/dreamteam-c4-AkosSchneider_DinaraKurmangaliyeva.py",
+        "inputs": [f"{EMBEDDING_DIR}/entity_embeddings.npy", f"{EMBEDDING_DIR}/entity_to_id.csv"],
+        "outputs": [
+            "data/kge/clustering/authors/authors_clusters_pca_k4.png",
+            "data/kge/clustering/authors/authors_clusters_k4.csv",
+        ],
+    },
+]
+
+STATE_PATH = "data/.pipeline_state.json"
+LOG_DIR = "data/pipeline_logs"
+
+
+def load_state():
+    if os.path.exists(STATE_PATH):
+        with open(STATE_PATH, encoding="utf-8") as file:
+            return json.load(file)
+    return {"stages": {}, "files": {}}
+
+
+def save_state(state):
+    tmp_path = STATE_PATH + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump(state, file, indent=2, sort_keys=True)
+    os.replace(tmp_path, STATE_PATH)
+
+
+def file_digest(path, file_cache):
+    """SHA-256 of a file; reuses the cached digest while size and mtime are unchanged"""
+    stat = os.stat(path)
+    cached = file_cache.get(path)
+    if cached and cached["size"] == stat.st_size and cached["mtime_ns"] == stat.st_mtime_ns:
+        return cached["sha256"]
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            digest.update(chunk)
+    file_cache[path] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest.hexdigest()}
+    return file_cache[path]["sha256"]
+
+
+def expand(patterns):
+    """Expand glob patterns, including compressed (.gz/.zst) variants of the matched files;
+    plain paths are kept even if missing so they show up as such"""
+    paths = []
+    for pattern in patterns:
+        matches = glob_data(pattern) if glob.has_magic(pattern) else [resolve(pattern)]
+        paths.extend(matches)
+    return paths
+
+
+def local_imports(script):
+    """The src/ modules a script imports, directly or through other src/ modules, sorted.
+
+    Imports inside functions count too (the scripts import their heavy helpers lazily), as do
+    importlib.import_module calls with a literal name.
+    """
+    source_dir = os.path.dirname(script)
+    found, pending = set(), [script]
+    while pending:
+        with open(pending.pop(), encoding="utf-8") as file:
+            tree = ast.parse(file.read())
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                names = [node.module]
+            elif (isinstance(node, ast.Call) and getattr(node.func, "attr", None) == "import_module"
+                  and node.args and isinstance(node.args[0], ast.Constant)):
+                names = [node.args[0].value]
+            else:
+                continue
+            for name in names:
+                path = os.path.join(source_dir, name.split(".")[0] + ".py")
+                if path != script and path not in found and os.path.exists(path):
+                    found.add(path)
+                    pending.append(path)
+    return sorted(found)
+
+
+def input_fingerprint(stage, file_cache):
+    """Combined hash over the stage's script, the src/ modules it imports and its input files,
+    or None if an input is missing"""
+    digest = hashlib.sha256()
+    for path in [stage["script"]] + local_imports(stage["script"]) + expand(stage["inputs"]):
+        if not os.path.exists(path):
+            return None
+        digest.update(path.encode())
+        digest.update(file_digest(path, file_cache).encode())
+    return digest.hexdigest()
+
+
+def is_fresh(stage, state, file_cache):
+    """A stage is fresh when its inputs hash like last time and its outputs are untouched"""
+    recorded = state["stages"].get(stage["name"])
+    if recorded is None or recorded["inputs"] != input_fingerprint(stage, file_cache):
+        return False
+    for path, sha in recorded["outputs"].items():
+        if not os.path.exists(path) or file_digest(path, file_cache) != sha:
+            return False
+    return True
+
+
+def dependencies(stages):
+    """Map each stage to the stages producing one of its inputs"""
+    producers = {path: s["name"] for s in stages for path in s["outputs"]}
+    return {
+        s["name"]: {producers[path] for path in s["inputs"] if path in producers and producers[path] != s["name"]}
+        for s in stages
+    }
+
+
+def select(stages, targets):
+    """The requested stages plus everything upstream of them"""
+    if not targets:
+        return stages
+    deps = dependencies(stages)
+    unknown = set(targets) - set(deps)
+    if unknown:
+        raise SystemExit(f"Unknown stage(s): {', '.join(sorted(unknown))}")
+    wanted, stack = set(), list(targets)
+    while stack:
+        name = stack.pop()
+        if name not in wanted:
+            wanted.add(name)
+            stack.extend(deps[name])
+    return [s for s in stages if s["name"] in wanted]
+
+
+def run_stage(stage):
+    """Run one stage script as a subprocess, logging its output to data/pipeline_logs/<stage>.log"""
+    os.makedirs(LOG_DIR, exist_ok=True)
+    log_path = os.path.join(LOG_DIR, f"{stage['name']}.log")
+    start = time.perf_counter()
+    with open(log_path, "w", encoding="utf-8") as log:
+        completed = subprocess.run([sys.executable, stage["script"]], stdout=log, stderr=subprocess.STDOUT)
+    return completed.returncode, time.perf_counter() - start, log_path
+
+
+def run_pipeline(targets=(), force=(), jobs=2, dry_run=False):
+    """Run the stale stages in dependency order, independent ones concurrently"""
+    stages = select(STAGES, list(targets))
+    deps = dependencies(stages)
+    by_name = {s["name"]: s for s in stages}
+    state = load_state()
+    file_cache = state["files"]
+
+    done, failed, stale, running = set(), set(), set(), {}
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        while len(done) + len(failed) < len(stages):
+            # Start every stage whose upstream stages have all finished
+            for name, stage in by_name.items():
+                if name in done or name in failed or name in running:
+                    continue
+                if deps[name] & failed:
+                    print(f"[blocked] {name} (upstream failed)")
+                    failed.add(name)
+                    continue
+                if not deps[name] <= done:
+                    continue
+
+                upstream_stale = dry_run and deps[name] & stale
+                if name not in force and not upstream_stale and is_fresh(stage, state, file_cache):
+                    print(f"[skip]    {name} (inputs unchanged)")
+                    done.add(name)
+                elif dry_run:
+                    print(f"[stale]   {name}")
+                    stale.add(name)
+                    done.add(name)
+                else:
+                    print(f"[run]     {name}: {stage['script']}")
+                    running[name] = executor.submit(run_stage, stage)
+
+            if not running:
+                continue
+
+            finished, _ = wait(running.values(), return_when=FIRST_COMPLETED)
+            for name in [n for n, future in running.items() if future in finished]:
+                returncode, seconds, log_path = running.pop(name).result()
+                stage = by_name[name]
+                if returncode != 0:
+                    print(f"[failed]  {name} after {seconds:.1f}s (exit {returncode}), see {log_path}")
+                    failed.add(name)
+                    continue
+
+                missing = [path for path in stage["outputs"] if not os.path.exists(path)]
+                if missing:
+                    print(f"[failed]  {name} did not produce {', '.join(missing)}")
+                    failed.add(name)
+                    continue
+
+                state["stages"][name] = {
+                    "inputs": input_fingerprint(stage, file_cache),
+                    "outputs": {path: file_digest(path, file_cache) for path in stage["outputs"]},
+                }
+                save_state(state)
+                print(f"[done]    {name} in {seconds:.1f}s")
+                done.add(name)
+
+    save_state(state)
+    return not failed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the TBOX -> ABOX -> KGE -> clustering chain, skipping up-to-date stages.")
+    parser.add_argument("targets", nargs="*", help=f"stages to bring up to date (default: all of {', '.join(s['name'] for s in STAGES)})")
+    parser.add_argument("--force", action="append", default=[], metavar="STAGE",
+                        help="stage to rerun even if up to date (repeatable)")
+    parser.add_argument("--jobs", type=int, default=2, help="number of stages to run concurrently")
+    parser.add_argument("--dry-run", action="store_true", help="only report which stages are stale")
+    args = parser.parse_args()
+
+    with span("pipeline.run"):
+        ok = run_pipeline(args.targets, set(args.force), args.jobs, args.dry_run)
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,221 @@
+import csv
+import itertools
+import os
+
+import numpy as np
+from compressed_io import open_text, resolve, with_compression
+from instrumentation import span
+
+ALL_TRIPLES_PATH = "data/kge/all_triples.tsv"
+OUTPUT_DIR = "data/kge"
+RATIOS = (0.8, 0.1, 0.1)  # train, valid, test
+CHUNK_ROWS = 1_000_000
+SEED = 42
+PARTITIONS = ("train", "valid", "test")
+
+# Coupled relations: triples that state the same fact from two sides must not be split apart,
+# or the test fact leaks through its partner in training. Every triple gets a group key, and
+# the partition is a function of the key alone:
+#   "pair": the (head, tail) pair, so hasAuthor and hasCorrAuthor on one (paper, author) agree;
+#   "head"/"tail": that entity, so hasReview(paper, review) and writtenBy(review, author)
+#   follow their review node.
+# Triples of other relations are their own group. The key entity of a "head"/"tail" group is
+# internal to the group (nothing else mentions a review node), so a held-out group would bring
+# an entity that train never contains. One triple of each such group, picked by hash, is kept in
+# train as its anchor; the rest of the group stays held out and is scorable.
+COUPLED = {"hasAuthor": "pair", "hasCorrAuthor": "pair", "hasReview": "tail", "writtenBy": "head"}
+MODES = {None: 0, "pair": 1, "head": 2, "tail": 3}
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+_ENTITY_TAG = np.uint64(0xD1B54A32D192ED03)
+
+
+def mix(x):
+    """splitmix64 finaliser on uint64 values (wrapping arithmetic)"""
+    with np.errstate(over="ignore"):
+        x = x ^ (x >> np.uint64(30))
+        x = x * np.uint64(0xBF58476D1CE4E5B9)
+        x = x ^ (x >> np.uint64(27))
+        x = x * np.uint64(0x94D049BB133111EB)
+        return x ^ (x >> np.uint64(31))
+
+
+def combine(a, b):
+    with np.errstate(over="ignore"):
+        return mix(a * _GOLDEN + b)
+
+
+def hash_labels(values):
+    """uint64 ids of label strings; equal labels get equal ids in every chunk and every run"""
+    import pandas as pd
+
+    return pd.util.hash_array(np.asarray(values, dtype=object))
+
+
+def read_chunks(path, chunk_rows=CHUNK_ROWS):
+    """Headerless (head, relation, tail) label TSV as string arrays of chunk_rows rows"""
+    import pandas as pd
+
+    with open_text(resolve(path)) as file:
+        for chunk in pd.read_csv(file, sep="\t", header=None, dtype=str, keep_default_na=False,
+                                 quoting=csv.QUOTE_NONE, chunksize=chunk_rows):
+            yield chunk.values
+
+
+def read_lines(path, chunk_rows=CHUNK_ROWS):
+    """The same rows as read_chunks, as raw lines (blank lines dropped, newline always present)"""
+    with open_text(resolve(path)) as file:
+        while True:
+            lines = [line if line.endswith("\n") else line + "\n"
+                     for line in itertools.islice(file, chunk_rows) if line.strip()]
+            if not lines:
+                return
+            yield np.array(lines, dtype=object)
+
+
+def encode(chunk):
+    """Hashed (head, relation, tail) ids and the group key of every triple in a label chunk"""
+    import pandas as pd
+
+    heads, relations, tails = (hash_labels(chunk[:, i]) for i in range(3))
+    codes, labels = pd.factorize(chunk[:, 1])
+    modes = np.array([MODES[COUPLED.get(label.rsplit("#", 1)[-1])] for label in labels], dtype=np.int8)[codes]
+    keys = combine(combine(heads, relations), tails)
+    keys = np.where(modes == 1, combine(heads, tails), keys)
+    keys = np.where(modes == 2, combine(heads, _ENTITY_TAG), keys)
+    keys = np.where(modes == 3, combine(tails, _ENTITY_TAG), keys)
+    return heads, relations, tails, keys, modes
+
+
+def partition(keys, ratios=RATIOS, seed=SEED):
+    """0 (train), 1 (valid) or 2 (test) per group key; a uniform draw per key, so every relation
+    is split in the given ratios in expectation"""
+    draw = (mix(keys ^ mix(np.uint64(seed))) >> np.uint64(11)).astype(np.float64) / float(1 << 53)
+    bounds = np.cumsum(ratios[:2]) / sum(ratios)
+    return np.searchsorted(bounds, draw, side="right").astype(np.int8)
+
+
+def assign_partitions(all_triples_path, ratios=RATIOS, seed=SEED, chunk_rows=CHUNK_ROWS):
+    """First pass: the partition of every triple in file order, its relation code, the relation
+    labels and the number of held-out triples per relation that were moved to train.
+
+    Every held-out "head"/"tail" group first moves its anchor triple to train. Then a held-out
+    group moves to train when one of its triples has an entity or relation that no training
+    triple contains. Moving triples only adds to train, so the held-out triples that stay keep
+    their coverage. Every triple costs three bytes (partition and relation code); only the
+    held-out rows (about a fifth) keep their hashes.
+    """
+    import pandas as pd
+
+    relation_code = {}
+    parts, codes, train_entities, held_out = [], [], [], []
+    offset = 0
+    for chunk in read_chunks(all_triples_path, chunk_rows):
+        heads, _, tails, keys, modes = encode(chunk)
+        chunk_codes, labels = pd.factorize(chunk[:, 1])
+        chunk_codes = np.array([relation_code.setdefault(label, len(relation_code)) for label in labels],
+                               dtype=np.uint16)[chunk_codes]
+        chunk_parts = partition(keys, ratios, seed)
+        train = chunk_parts == 0
+        train_entities.append(np.unique(np.concatenate([heads[train], tails[train]])))
+        rows = np.flatnonzero(~train)
+        held_out.append((rows + offset, heads[rows], chunk_codes[rows], tails[rows], keys[rows], modes[rows]))
+        parts.append(chunk_parts)
+        codes.append(chunk_codes)
+        offset += len(chunk)
+
+    parts = np.concatenate(parts) if parts else np.empty(0, dtype=np.int8)
+    codes = np.concatenate(codes) if codes else np.empty(0, dtype=np.uint16)
+    if len(relation_code) > np.iinfo(np.uint16).max:
+        raise ValueError(f"{len(relation_code)} relations do not fit the 16-bit relation codes")
+    rows, heads, held_codes, tails, keys, modes = (np.concatenate(column) for column in zip(*held_out)) if held_out \
+        else (np.empty(0, dtype=np.int64),) * 6
+
+    # Anchors: the held-out triple with the smallest triple hash in each "head"/"tail" group
+    anchored = np.flatnonzero((modes == MODES["head"]) | (modes == MODES["tail"]))
+    triple_hash = combine(combine(heads[anchored], held_codes[anchored].astype(np.uint64)), tails[anchored])
+    order = anchored[np.lexsort((triple_hash, keys[anchored]))]
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = keys[order][1:] != keys[order][:-1]
+    anchor = np.zeros(len(rows), dtype=bool)
+    anchor[order[first]] = True
+    parts[rows[anchor]] = 0
+    train_entities.append(np.concatenate([heads[anchor], tails[anchor]]))
+
+    train_entities = np.unique(np.concatenate(train_entities)) if train_entities else np.empty(0, dtype=np.uint64)
+    train_relations = np.unique(codes[parts == 0])
+    covered = np.isin(heads, train_entities) & np.isin(tails, train_entities) & np.isin(held_codes, train_relations)
+    demoted = np.isin(keys, np.unique(keys[~covered & ~anchor]))
+    parts[rows[demoted]] = 0
+    moved = np.bincount(held_codes[demoted | anchor].astype(np.int64), minlength=len(relation_code))
+    return parts, codes, sorted(relation_code, key=relation_code.get), moved, int(np.unique(keys[demoted]).size)
+
+
+def stratified_split(all_triples_path=ALL_TRIPLES_PATH, output_dir=OUTPUT_DIR, ratios=RATIOS, seed=SEED,
+                     compression=None, chunk_rows=CHUNK_ROWS):
+    """Split all_triples.tsv into train/valid/test.tsv in two streaming passes.
+
+    Coupled triples share a partition, and every valid/test entity and relation also occurs in
+    train. The second pass copies the raw lines, so nothing is parsed or formatted twice.
+    Returns the output paths and a per-relation count table whose "moved" column counts the
+    held-out triples that went to train for coverage (see shortfalls()).
+    """
+    import pandas as pd
+
+    if len(ratios) != len(PARTITIONS) or min(ratios) < 0 or not sum(ratios):
+        raise ValueError(f"ratios must be three non-negative train/valid/test fractions, got {ratios}")
+    with span("split.stratified.assign") as stage:
+        parts, codes, relations, moved, demoted = assign_partitions(all_triples_path, ratios, seed, chunk_rows)
+        stage.count("triples", len(parts))
+        stage.count("demoted_groups", demoted)
+
+    os.makedirs(output_dir, exist_ok=True)
+    paths = [with_compression(os.path.join(output_dir, f"{name}.tsv"), compression) for name in PARTITIONS]
+    with span("split.stratified.write") as stage:
+        files = [open_text(path, "w") for path in paths]
+        try:
+            offset = 0
+            for lines in read_lines(all_triples_path, chunk_rows):
+                chunk_parts = parts[offset:offset + len(lines)]
+                for index, file in enumerate(files):
+                    file.write("".join(lines[chunk_parts == index]))
+                offset += len(lines)
+            stage.count("triples", offset)
+        finally:
+            for file in files:
+                file.close()
+    if offset != len(parts):
+        raise ValueError(f"{all_triples_path} changed during the split ({len(parts)} rows parsed, {offset} copied)")
+
+    counts = np.bincount(codes.astype(np.int64) * len(PARTITIONS) + parts, minlength=len(relations) * len(PARTITIONS))
+    table = pd.DataFrame(counts.reshape(-1, len(PARTITIONS)), columns=list(PARTITIONS),
+                         index=[label.rsplit("#", 1)[-1] for label in relations])
+    table["moved"] = moved
+    return paths, table
+
+
+def shortfalls(table, ratios=RATIOS):
+    """One line per relation whose held-out share fell short because triples moved to train"""
+    held_out_share = 1 - ratios[0] / sum(ratios)
+    lines = []
+    for relation, row in table[table["moved"] > 0].iterrows():
+        total = int(row[list(PARTITIONS)].sum())
+        target = round(total * held_out_share)
+        if total - row["train"] < target:
+            lines.append(f"{relation}: {row['moved']} of {total} triples moved to train for coverage, "
+                         f"{total - row['train']} held out (target about {target})")
+    return lines
+
+
+def main(all_triples_path=ALL_TRIPLES_PATH, output_dir=OUTPUT_DIR, ratios=RATIOS, seed=SEED, compression=None):
+    paths, table = stratified_split(all_triples_path, output_dir, ratios, seed, compression)
+    print(table.to_string())
+    for line in shortfalls(table, ratios):
+        print(f"Warning: {line}")
+    for name, path in zip(PARTITIONS, paths):
+        print(f"Saved {table[name].sum()} {name} triples to {path}")
+    return paths
+
+
+if __name__ == "__main__":
+    main()
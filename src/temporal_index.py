@@ -0,0 +1,160 @@
+import os
+
+import numpy as np
+from rdflib import Namespace, URIRef
+from instrumentation import span
+
+PUB = Namespace("http://example.org/publication-ontology#")
+ABOX_FILE = "data/ontology/dreamteam-b2-AkosSchneider_DinaraKurmangaliyeva.ttl"
+UNDATED = -1
+
+# A triple is dated by its subject's pub:year (cite, hasAuthor, publishedIn, ...), or by its
+# object's year when only the object has one (hasEdition, hasVolume). Reviewed papers are separate
+# paper_pub_<key> nodes without a year, so they take the year of paper_<key>, and each review takes
+# the year of the paper that hasReview points from (see dated_through_papers); that dates
+# hasReview, writtenBy and the publishedIn triples of the reviewed papers. Triples touching no
+# dated entity (schema triples, ...) are UNDATED and belong to every time slice.
+REVIEWED_PREFIX = str(PUB) + "paper_pub_"
+PAPER_PREFIX = str(PUB) + "paper_"
+
+
+class YearIndex:
+    """Entities with a pub:year, sorted by year, so a year range is two binary searches"""
+
+    def __init__(self, entities, years):
+        order = np.argsort(years, kind="stable")
+        self.years = np.asarray(years, dtype=np.int32)[order]
+        self.entities = np.asarray(entities, dtype=object)[order]
+        self.year_of = dict(zip(self.entities, self.years.tolist()))
+
+    def __len__(self):
+        return len(self.entities)
+
+    def bounds(self, start=None, end=None):
+        """Positions of the entities with start <= year <= end (either bound may be open)"""
+        low = 0 if start is None else np.searchsorted(self.years, start, side="left")
+        high = len(self.years) if end is None else np.searchsorted(self.years, end, side="right")
+        return low, high
+
+    def range(self, start=None, end=None):
+        """Entity URIs dated within [start, end], as a view on the sorted array"""
+        low, high = self.bounds(start, end)
+        return self.entities[low:high]
+
+    def counts(self):
+        """{year: number of dated entities}"""
+        values, counts = np.unique(self.years, return_counts=True)
+        return dict(zip(values.tolist(), counts.tolist()))
+
+    def subgraph(self, g, start=None, end=None):
+        """Triples of g whose subject is dated within [start, end], read from g without copying it"""
+        for entity in self.range(start, end):
+            yield from g.triples((URIRef(entity), None, None))
+
+
+def build_year_index(g):
+    """YearIndex over every subject with a pub:year literal in g (Graph or Snapshot)"""
+    entities, years = [], []
+    for s, _, o in g.triples((None, PUB.year, None)):
+        entities.append(str(s))
+        years.append(int(o))
+    return YearIndex(entities, years)
+
+
+def load_year_index(abox_path=ABOX_FILE):
+    """YearIndex from a Turtle file, an .rdfsnap snapshot or a shard directory (year shard only)"""
+    with span("temporal.year_index") as stage:
+        if os.path.isdir(abox_path):
+            from abox_shards import load_shards
+
+            g = load_shards(abox_path, kinds=["literal"], names=["year"])
+        else:
+            from rdf_snapshot import open_graph
+
+            g = open_graph(abox_path)
+        index = build_year_index(g)
+        stage.count("entities", len(index))
+    return index
+
+
+def dated_through_papers(triples, year_of):
+    """year_of extended to the reviewed-paper nodes and, through hasReview, to their reviews"""
+    year_of = dict(year_of)
+    has_review = str(PUB.hasReview)
+    for entity in set(triples[:, 0]) | set(triples[:, 2]):
+        if entity.startswith(REVIEWED_PREFIX) and entity not in year_of:
+            year = year_of.get(PAPER_PREFIX + entity.removeprefix(REVIEWED_PREFIX))
+            if year is not None:
+                year_of[entity] = year
+    for s, p, o in triples:
+        if p == has_review and s in year_of:
+            # A review shared by several papers counts from the earliest of them
+            year_of[o] = min(year_of[s], year_of.get(o, year_of[s]))
+    return year_of
+
+
+class TemporalTriples:
+    """Label triples sorted by year; a year range is a contiguous slice, i.e. a numpy view"""
+
+    def __init__(self, triples, year_index):
+        triples = np.asarray(triples, dtype=object).reshape(-1, 3)
+        get = dated_through_papers(triples, year_index.year_of).get
+        years = np.array(
+            [get(s, get(o, UNDATED)) for s, o in zip(triples[:, 0], triples[:, 2])],
+            dtype=np.int32,
+        )
+        order = np.argsort(years, kind="stable")
+        self.triples = triples[order]
+        self.years = years[order]
+        # UNDATED sorts first, so the dated triples start here
+        self.first_dated = int(np.searchsorted(self.years, UNDATED, side="right"))
+
+    @classmethod
+    def from_tsv(cls, path, year_index):
+        from compressed_io import read_tsv
+
+        return cls(read_tsv(path), year_index)
+
+    def undated(self):
+        return self.triples[:self.first_dated]
+
+    def range(self, start=None, end=None):
+        """Dated triples with start <= year <= end"""
+        low = self.first_dated if start is None else max(self.first_dated, np.searchsorted(self.years, start, side="left"))
+        high = len(self.years) if end is None else np.searchsorted(self.years, end, side="right")
+        return self.triples[low:high]
+
+    def snapshot(self, end):
+        """The graph as of `end`: undated triples plus everything dated up to and including `end`"""
+        high = np.searchsorted(self.years, end, side="right")
+        return self.triples[:high]
+
+    def split(self, split_year):
+        """Time-respecting (train, test): train is the snapshot before split_year, test the triples
+        dated split_year or later whose entities and relation all occur in train"""
+        train = self.snapshot(split_year - 1)
+        test = self.range(split_year)
+        known = set(train[:, 0]) | set(train[:, 2])
+        relations = set(train[:, 1])
+        keep = np.fromiter(
+            ((s in known and o in known and p in relations) for s, p, o in test),
+            dtype=bool,
+            count=len(test),
+        )
+        return train, test[keep]
+
+
+def main(abox_path=ABOX_FILE, start=None, end=None):
+    index = load_year_index(abox_path)
+    counts = index.counts()
+    if not counts:
+        print(f"No pub:year literals in {abox_path}")
+        return
+    print(f"{len(index)} dated entities, years {min(counts)}-{max(counts)}")
+    for year, count in counts.items():
+        if (start is None or year >= start) and (end is None or year <= end):
+            print(f"{year}  {count:>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+import hashlib
+import json
+import os
+import re
+import time
+
+import numpy as np
+from rdflib import Namespace
+from instrumentation import span
+
+PUB = Namespace("http://example.org/publication-ontology#")
+ABOX_FILE = "data/ontology/dreamteam-b2-AkosSchneider_DinaraKurmangaliyeva.ttl"
+INDEX_DIR = "data/search/text_index"
+
+# Indexed literal properties and their BM25F-style weights: a term in a title, author name or
+# topic keyword counts twice as much as the same term in an abstract
+FIELDS = {"title": 2.0, "abstract": 1.0, "name": 2.0, "hasKeyword": 2.0}
+K1 = 1.2
+B = 0.75
+
+STOPWORDS = set("""
+a an and are as at be by for from has have in is it its of on or our that the their this to
+we which with paper titled presents proposed method approach results
+""".split())
+TOKEN = re.compile(r"[a-z0-9]+")
+
+ARRAYS = ["forward_ptr", "forward_terms", "forward_tf", "doc_len", "postings_ptr", "postings_doc", "postings_tf"]
+
+
+def tokenize(text):
+    return [t for t in TOKEN.findall(text.lower()) if t not in STOPWORDS and len(t) > 1]
+
+
+def collect_documents(g):
+    """{subject URI: {field: text}} for every subject with at least one indexed literal"""
+    values = {}
+    for field in FIELDS:
+        for s, _, o in g.triples((None, PUB[field], None)):
+            values.setdefault(str(s), {}).setdefault(field, []).append(str(o))
+    # Sorted values keep the text, and so the document hash, independent of triple order
+    return {uri: {field: " ".join(sorted(texts)) for field, texts in fields.items()} for uri, fields in values.items()}
+
+
+def document_hash(fields):
+    digest = hashlib.sha1()
+    for field in sorted(fields):
+        digest.update(f"{field}\x00{fields[field]}\x00".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def term_weights(fields, term_id):
+    """Field-weighted term frequencies of one document; new terms are appended to term_id"""
+    weights = {}
+    for field, text in fields.items():
+        for token in tokenize(text):
+            index = term_id.setdefault(token, len(term_id))
+            weights[index] = weights.get(index, 0.0) + FIELDS[field]
+    return weights
+
+
+def load_index_files(index_dir, mmap_mode="r"):
+    with open(os.path.join(index_dir, "meta.json"), encoding="utf-8") as file:
+        meta = json.load(file)
+    with open(os.path.join(index_dir, "vocab.json"), encoding="utf-8") as file:
+        vocab = json.load(file)
+    with open(os.path.join(index_dir, "docs.json"), encoding="utf-8") as file:
+        docs = json.load(file)
+    arrays = {name: np.load(os.path.join(index_dir, f"{name}.npy"), mmap_mode=mmap_mode) for name in ARRAYS}
+    return meta, vocab, docs, arrays
+
+
+def build_index(g, index_dir=INDEX_DIR, full=False):
+    """Build or incrementally update the inverted index from the ABOX literals.
+
+    Documents whose indexed text hashes the same as in the previous index keep their stored
+    term vector; only new or changed documents are tokenized. The term list is append-only
+    between full rebuilds, so stored term ids stay valid. Returns reuse/tokenize counts.
+    """
+    documents = collect_documents(g)
+
+    previous = {}
+    vocab = []
+    if not full and os.path.exists(os.path.join(index_dir, "meta.json")):
+        meta, vocab, old_docs, old = load_index_files(index_dir, mmap_mode=None)
+        for position, doc in enumerate(old_docs):
+            start, end = old["forward_ptr"][position], old["forward_ptr"][position + 1]
+            previous[doc["uri"]] = (doc["hash"], old["forward_terms"][start:end], old["forward_tf"][start:end])
+    term_id = {term: i for i, term in enumerate(vocab)}
+
+    stats = {"documents": len(documents), "reused": 0, "tokenized": 0, "removed": len(set(previous) - set(documents))}
+    docs, terms, tfs, lengths = [], [], [], []
+    with span("text_index.term_vectors") as stage:
+        for uri in sorted(documents):
+            digest = document_hash(documents[uri])
+            if uri in previous and previous[uri][0] == digest:
+                doc_terms, doc_tf = previous[uri][1], previous[uri][2]
+                stats["reused"] += 1
+            else:
+                weights = term_weights(documents[uri], term_id)
+                doc_terms = np.fromiter(weights.keys(), dtype=np.uint32, count=len(weights))
+                doc_tf = np.fromiter(weights.values(), dtype=np.float32, count=len(weights))
+                stats["tokenized"] += 1
+            docs.append({"uri": uri, "hash": digest})
+            terms.append(doc_terms)
+            tfs.append(doc_tf)
+            lengths.append(float(doc_tf.sum()))
+        stage.count("documents", len(documents))
+        stage.count("tokenized", stats["tokenized"])
+
+    vocab = sorted(term_id, key=term_id.get)
+    sizes = np.array([len(t) for t in terms], dtype=np.int64)
+    forward_terms = np.concatenate(terms).astype(np.uint32) if terms else np.empty(0, dtype=np.uint32)
+    forward_tf = np.concatenate(tfs).astype(np.float32) if tfs else np.empty(0, dtype=np.float32)
+    forward_doc = np.repeat(np.arange(len(docs), dtype=np.uint32), sizes)
+
+    # Invert: postings grouped by term, documents ascending within a term
+    with span("text_index.invert") as stage:
+        order = np.lexsort((forward_doc, forward_terms))
+        postings_ptr = np.zeros(len(vocab) + 1, dtype=np.int64)
+        postings_ptr[1:] = np.cumsum(np.bincount(forward_terms, minlength=len(vocab)))
+        stage.count("postings", len(order))
+
+    arrays = {
+        "forward_ptr": np.concatenate([[0], np.cumsum(sizes)]).astype(np.int64),
+        "forward_terms": forward_terms,
+        "forward_tf": forward_tf,
+        "doc_len": np.array(lengths, dtype=np.float32),
+        "postings_ptr": postings_ptr,
+        "postings_doc": forward_doc[order],
+        "postings_tf": forward_tf[order],
+    }
+    meta = {
+        "num_docs": len(docs),
+        "avgdl": float(np.mean(lengths)) if lengths else 0.0,
+        "k1": K1,
+        "b": B,
+        "fields": FIELDS,
+    }
+
+    os.makedirs(index_dir, exist_ok=True)
+    for name, array in arrays.items():
+        np.save(os.path.join(index_dir, f"{name}.npy"), array)
+    for name, value in (("vocab", vocab), ("docs", docs), ("meta", meta)):
+        with open(os.path.join(index_dir, f"{name}.json"), "w", encoding="utf-8") as file:
+            json.dump(value, file)
+    return stats
+
+
+class TextIndex:
+    """BM25 search over a built index; the postings are memory-mapped, not loaded"""
+
+    def __init__(self, index_dir=INDEX_DIR):
+        self.meta, vocab, docs, self.arrays = load_index_files(index_dir)
+        self.term_id = {term: i for i, term in enumerate(vocab)}
+        self.uris = [doc["uri"] for doc in docs]
+        self.num_docs = self.meta["num_docs"]
+        self.postings_ptr = np.asarray(self.arrays["postings_ptr"])
+        # Per-document BM25 length normalisation is fixed for the whole index
+        k1, b = self.meta["k1"], self.meta["b"]
+        avgdl = self.meta["avgdl"] or 1.0
+        self.norm = k1 * (1 - b + b * np.asarray(self.arrays["doc_len"]) / avgdl)
+
+    def search(self, query, k=10):
+        """Top-k (URI, score) pairs for a free-text query"""
+        scores = np.zeros(self.num_docs, dtype=np.float32)
+        k1 = self.meta["k1"]
+        for term in set(tokenize(query)):
+            index = self.term_id.get(term)
+            if index is None:
+                continue
+            start, end = self.postings_ptr[index], self.postings_ptr[index + 1]
+            if start == end:
+                continue
+            doc = np.asarray(self.arrays["postings_doc"][start:end])
+            tf = np.asarray(self.arrays["postings_tf"][start:end])
+            df = end - start
+            idf = np.log(1 + (self.num_docs - df + 0.5) / (df + 0.5))
+            scores[doc] += idf * tf * (k1 + 1) / (tf + self.norm[doc])
+
+        hits = np.flatnonzero(scores)
+        if len(hits) > k:
+            hits = hits[np.argpartition(-scores[hits], k - 1)[:k]]
+        hits = hits[np.argsort(-scores[hits])]
+        return [(self.uris[i], float(scores[i])) for i in hits]
+
+
+def main(abox_file=ABOX_FILE, index_dir=INDEX_DIR, full=False):
+    from rdf_snapshot import open_graph
+
+    with span("text_index.load") as stage:
+        g = open_graph(abox_file)
+        stage.count("triples", len(g))
+    start = time.perf_counter()
+    stats = build_index(g, index_dir, full)
+    print(f"Indexed {stats['documents']} documents into {index_dir} in {time.perf_counter() - start:.2f}s "
+          f"({stats['tokenized']} tokenized, {stats['reused']} reused, {stats['removed']} removed)")
+
+
+if __name__ == "__main__":
+    main()
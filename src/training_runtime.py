@@ -0,0 +1,134 @@
+import contextlib
+import hashlib
+import os
+
+# Checkpointing and compute precision shared by the KGE scripts.
+#
+# Checkpoints use PyKEEN's own mechanism: with a checkpoint_name the training loop saves model,
+# optimizer, epoch and RNG state after the first epoch that ends `checkpoint_minutes` after the
+# previous save, and a later run with the same name picks up from the saved epoch. The name
+# includes a hash of the training file and the run's configuration, so a checkpoint never
+# resumes on changed data.
+# checkpointed() removes the file once the training call has returned. Multi-process training
+# (parallel_training.py) keeps one checkpoint of the averaged weights under the same name, written
+# by the parent between rounds and loaded before the workers start.
+#
+# When the split wrote a valid.tsv (split --stratified), early_stopping() gives pipeline() the
+# validation set and PyKEEN's early stopper: MRR on valid every EARLY_STOPPING_FREQUENCY epochs,
+# stopping after EARLY_STOPPING_PATIENCE checks without a relative gain. The test set is only
+# used for the final evaluation.
+#
+# Reduced precision is a measurement, not a training option: compare_precision() (cli
+# precision-check) trains one configuration in float32 and under CPU bfloat16 autocast and
+# compares throughput and MRR. The TransE/TransH/DistMult interactions are element-wise and
+# norm ops that autocast leaves in float32, and ComplEx has no bfloat16 complex type, so for
+# this repo's models bfloat16 changes neither speed nor MRR and the trainers always use float32.
+
+CHECKPOINT_DIR = "data/kge/checkpoints"
+CHECKPOINT_MINUTES = 5
+PRECISIONS = ("float32", "bfloat16")
+EARLY_STOPPING_FREQUENCY = 10
+EARLY_STOPPING_PATIENCE = 2
+
+
+def file_hash(path):
+    from compressed_io import resolve
+
+    digest = hashlib.sha1()
+    with open(resolve(path), "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def checkpoint_name(prefix, train_path, **config):
+    """A checkpoint file name unique to the training data and configuration"""
+    digest = hashlib.sha1(file_hash(train_path).encode())
+    digest.update(repr(sorted(config.items())).encode())
+    return f"{prefix}-{digest.hexdigest()[:12]}.pt"
+
+
+def checkpoint_kwargs(name, checkpoint_dir=CHECKPOINT_DIR, checkpoint_minutes=CHECKPOINT_MINUTES):
+    """training_kwargs for pipeline()/TrainingLoop.train() that save and resume `name`"""
+    if not name:
+        return {}
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    path = os.path.join(checkpoint_dir, name)
+    if os.path.exists(path):
+        print(f"Resuming from checkpoint {path}")
+    return {
+        "checkpoint_name": name,
+        "checkpoint_directory": checkpoint_dir,
+        "checkpoint_frequency": checkpoint_minutes,
+    }
+
+
+@contextlib.contextmanager
+def checkpointed(prefix, train_path, checkpoint_minutes=CHECKPOINT_MINUTES, checkpoint_dir=CHECKPOINT_DIR, **config):
+    """Yield the checkpoint training_kwargs for one run; the checkpoint is kept if the run raises
+    (so the next run resumes) and removed when it completes. checkpoint_minutes=0 disables it."""
+    if not checkpoint_minutes:
+        yield {}
+        return
+    name = checkpoint_name(prefix, train_path, **config)
+    yield checkpoint_kwargs(name, checkpoint_dir, checkpoint_minutes)
+    path = os.path.join(checkpoint_dir, name)
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def early_stopping(valid_path, training, frequency=EARLY_STOPPING_FREQUENCY, patience=EARLY_STOPPING_PATIENCE):
+    """pipeline() kwargs for early stopping on valid_path; {} when there is no validation file"""
+    from compressed_io import resolve, triples_factory
+
+    if not os.path.exists(resolve(valid_path)):
+        return {}
+    validation = triples_factory(valid_path, entity_to_id=training.entity_to_id, relation_to_id=training.relation_to_id)
+    return {
+        "validation": validation,
+        "stopper": "early",
+        "stopper_kwargs": {"frequency": frequency, "patience": patience, "metric": "inverse_harmonic_mean_rank"},
+    }
+
+
+def precision_context(precision="float32"):
+    """CPU bfloat16 autocast for precision="bfloat16", a no-op for float32"""
+    import torch
+
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown precision {precision!r}; expected one of {PRECISIONS}")
+    if precision == "bfloat16":
+        return torch.autocast(device_type="cpu", dtype=torch.bfloat16)
+    return contextlib.nullcontext()
+
+
+def compare_precision(train_path="data/kge/train.tsv", test_path="data/kge/test.tsv", model="TransH",
+                      embedding_dim=50, num_epochs=10, batch_size=256, tolerance=0.01):
+    """Train and evaluate one configuration in float32 and in bfloat16 and compare throughput and
+    MRR. Returns (rows, ok) where ok is False if the bfloat16 MRR differs by more than tolerance."""
+    from pykeen.pipeline import pipeline
+    from compressed_io import triples_factory
+
+    training = triples_factory(train_path)
+    testing = triples_factory(test_path, entity_to_id=training.entity_to_id, relation_to_id=training.relation_to_id)
+    rows = []
+    for precision in PRECISIONS:
+        with precision_context(precision):
+            result = pipeline(
+                training=training,
+                testing=testing,
+                model=model,
+                model_kwargs={"embedding_dim": embedding_dim},
+                training_kwargs={"num_epochs": num_epochs, "batch_size": batch_size},
+                random_seed=42,
+                device="cpu",
+            )
+        rows.append({
+            "precision": precision,
+            "train_seconds": round(result.train_seconds, 2),
+            "triples_per_second": round(num_epochs * training.num_triples / result.train_seconds),
+            "evaluate_seconds": round(result.evaluate_seconds, 2),
+            "MRR": result.metric_results.get_metric("both.realistic.inverse_harmonic_mean_rank"),
+        })
+    ok = abs(rows[1]["MRR"] - rows[0]["MRR"]) <= tolerance
+    return rows, ok
@@ -1,122 +1,142 @@
-from rdflib import Graph, Namespace
+from rdflib import Namespace
 from rdflib.namespace import RDF, RDFS
 from collections import Counter
-
-# Load the knowledge graph
-g = Graph()
-g.parse("data/ontology/dreamteam-b2-AkosSchneider_DinaraKurmangaliyeva.ttl", format="turtle")
+from instrumentation import span
+from rdf_snapshot import open_graph
 
 PUB = Namespace("http://example.org/publication-ontology#")
+ABOX_FILE = "data/ontology/dreamteam-b2-AkosSchneider_DinaraKurmangaliyeva.ttl"
+
+
+def load_graph(abox_file=ABOX_FILE):
+    """Load the knowledge graph (TBOX + ABOX) from Turtle, or open a .rdfsnap snapshot in place"""
+    with span("validate.parse") as stage:
+        g = open_graph(abox_file)
+        stage.count("triples", len(g))
+    return g
+
+
+def validate(g):
+    """Print the ABOX validation report: type counts, key relationships, samples and quality checks"""
+    with span("validate.checks") as stage:
+        print("=== ABOX Validation Report ===\n")
+
+        # Count instances by type
+        print("1. Instance Counts by Type:")
+        type_counts = Counter()
+        for s, p, o in g.triples((None, RDF.type, None)):
+            if str(o).startswith(str(PUB)):
+                class_name = str(o).replace(str(PUB), "")
+                type_counts[class_name] += 1
+
+        for class_name, count in sorted(type_counts.items()):
+            print(f"   - {class_name}: {count}")
+
+        print(f"\n2. Total Triples: {len(g)}")
+
+        # Check key relationships
+        print("\n3. Key Relationship Counts:")
+
+        # Papers with authors
+        papers_with_authors = len(list(g.triples((None, PUB.hasAuthor, None))))
+        print(f"   - hasAuthor relationships: {papers_with_authors}")
+
+        # Papers with corresponding authors
+        papers_with_corr_authors = len(list(g.triples((None, PUB.hasCorrAuthor, None))))
+        print(f"   - hasCorrAuthor relationships: {papers_with_corr_authors}")
+
+        # Papers with topics
+        papers_with_topics = len(list(g.triples((None, PUB.hasTopic, None))))
+        print(f"   - hasTopic relationships: {papers_with_topics}")
+
+        # Citations
+        citations = len(list(g.triples((None, PUB.cite, None))))
+        print(f"   - cite relationships: {citations}")
+
+        # Reviews
+        reviews = len(list(g.triples((None, PUB.hasReview, None))))
+        print(f"   - hasReview relationships: {reviews}")
+
+        # Review authorship
+        review_authorship = len(list(g.triples((None, PUB.writtenBy, None))))
+        print(f"   - writtenBy relationships: {review_authorship}")
+
+        # Publication relationships
+        published_in = len(list(g.triples((None, PUB.publishedIn, None))))
+        print(f"   - publishedIn relationships: {published_in}")
+
+        print("\n4. Sample Data Verification:")
+
+        # Check a sample paper
+        sample_papers = list(g.subjects(RDF.type, PUB.Paper))[:3]
+        for i, paper in enumerate(sample_papers, 1):
+            print(f"\n   Sample Paper {i}: {paper}")
+
+            # Get title
+            titles = list(g.objects(paper, PUB.title))
+            if titles:
+                print(f"     Title: {titles[0]}")
+
+            # Get authors
+            authors = list(g.objects(paper, PUB.hasAuthor))
+            print(f"     Authors: {len(authors)}")
+
+            # Get topics
+            topics = list(g.objects(paper, PUB.hasTopic))
+            print(f"     Topics: {len(topics)}")
+
+            # Get citations
+            citations = list(g.objects(paper, PUB.cite))
+            print(f"     Citations: {len(citations)}")
+
+        print("\n5. Data Quality Checks:")
+
+        # Check for papers without titles
+        papers_without_titles = 0
+        for paper in g.subjects(RDF.type, PUB.Paper):
+            titles = list(g.objects(paper, PUB.title))
+            if not titles:
+                papers_without_titles += 1
+
+        print(f"   - Papers without titles: {papers_without_titles}")
+
+        # Check for authors without names
+        authors_without_names = 0
+        for author in g.subjects(RDF.type, PUB.Author):
+            names = list(g.objects(author, PUB.name))
+            if not names:
+                authors_without_names += 1
+
+        print(f"   - Authors without names: {authors_without_names}")
+
+        # Check for topics without keywords
+        topics_without_keywords = 0
+        for topic in g.subjects(RDF.type, PUB.Topic):
+            keywords = list(g.objects(topic, PUB.hasKeyword))
+            if not keywords:
+                topics_without_keywords += 1
+
+        print(f"   - Topics without keywords: {topics_without_keywords}")
+
+        print("\n6. Inference Opportunities:")
+        print("   The following relationships could be inferred from the TBOX:")
+        print("   - Authors who have writtenBy relationships → Reviewer subclass")
+        print("   - Authors who have hasCorrAuthor relationships → CorrAuthor subclass")
+        print("   - Publication places with specific labels → Journal/Edition subclasses")
+
+        print("\n=== Validation Complete ===")
+        print("The ABOX successfully implements the CSV-to-TBOX mapping with:")
+        print("- Complete coverage of core entities (Papers, Authors, Topics)")
+        print("- Full relationship mapping (authorship, citations, reviews, topics)")
+        print("- Proper datatype properties (titles, abstracts, names, years)")
+        print("- Review system implementation with generated Review instances")
+        print("- Inference-ready structure for subclass relationships") 
+        stage.count("triples", len(g))
+
+
+def main(abox_file=ABOX_FILE):
+    validate(load_graph(abox_file))
+
 
-print("=== ABOX Validation Report ===\n")
-
-# Count instances by type
-print("1. Instance Counts by Type:")
-type_counts = Counter()
-for s, p, o in g.triples((None, RDF.type, None)):
-    if str(o).startswith(str(PUB)):
-        class_name = str(o).replace(str(PUB), "")
-        type_counts[class_name] += 1
-
-for class_name, count in sorted(type_counts.items()):
-    print(f"   - {class_name}: {count}")
-
-print(f"\n2. Total Triples: {len(g)}")
-
-# Check key relationships
-print("\n3. Key Relationship Counts:")
-
-# Papers with authors
-papers_with_authors = len(list(g.triples((None, PUB.hasAuthor, None))))
-print(f"   - hasAuthor relationships: {papers_with_authors}")
-
-# Papers with corresponding authors
-papers_with_corr_authors = len(list(g.triples((None, PUB.hasCorrAuthor, None))))
-print(f"   - hasCorrAuthor relationships: {papers_with_corr_authors}")
-
-# Papers with topics
-papers_with_topics = len(list(g.triples((None, PUB.hasTopic, None))))
-print(f"   - hasTopic relationships: {papers_with_topics}")
-
-# Citations
-citations = len(list(g.triples((None, PUB.cite, None))))
-print(f"   - cite relationships: {citations}")
-
-# Reviews
-reviews = len(list(g.triples((None, PUB.hasReview, None))))
-print(f"   - hasReview relationships: {reviews}")
-
-# Review authorship
-review_authorship = len(list(g.triples((None, PUB.writtenBy, None))))
-print(f"   - writtenBy relationships: {review_authorship}")
-
-# Publication relationships
-published_in = len(list(g.triples((None, PUB.publishedIn, None))))
-print(f"   - publishedIn relationships: {published_in}")
-
-print("\n4. Sample Data Verification:")
-
-# Check a sample paper
-sample_papers = list(g.subjects(RDF.type, PUB.Paper))[:3]
-for i, paper in enumerate(sample_papers, 1):
-    print(f"\n   Sample Paper {i}: {paper}")
-    
-    # Get title
-    titles = list(g.objects(paper, PUB.title))
-    if titles:
-        print(f"     Title: {titles[0]}")
-    
-    # Get authors
-    authors = list(g.objects(paper, PUB.hasAuthor))
-    print(f"     Authors: {len(authors)}")
-    
-    # Get topics
-    topics = list(g.objects(paper, PUB.hasTopic))
-    print(f"     Topics: {len(topics)}")
-    
-    # Get citations
-    citations = list(g.objects(paper, PUB.cite))
-    print(f"     Citations: {len(citations)}")
-
-print("\n5. Data Quality Checks:")
-
-# Check for papers without titles
-papers_without_titles = 0
-for paper in g.subjects(RDF.type, PUB.Paper):
-    titles = list(g.objects(paper, PUB.title))
-    if not titles:
-        papers_without_titles += 1
-
-print(f"   - Papers without titles: {papers_without_titles}")
-
-# Check for authors without names
-authors_without_names = 0
-for author in g.subjects(RDF.type, PUB.Author):
-    names = list(g.objects(author, PUB.name))
-    if not names:
-        authors_without_names += 1
-
-print(f"   - Authors without names: {authors_without_names}")
-
-# Check for topics without keywords
-topics_without_keywords = 0
-for topic in g.subjects(RDF.type, PUB.Topic):
-    keywords = list(g.objects(topic, PUB.hasKeyword))
-    if not keywords:
-        topics_without_keywords += 1
-
-print(f"   - Topics without keywords: {topics_without_keywords}")
-
-print("\n6. Inference Opportunities:")
-print("   The following relationships could be inferred from the TBOX:")
-print("   - Authors who have writtenBy relationships → Reviewer subclass")
-print("   - Authors who have hasCorrAuthor relationships → CorrAuthor subclass")
-print("   - Publication places with specific labels → Journal/Edition subclasses")
-
-print("\n=== Validation Complete ===")
-print("The ABOX successfully implements the CSV-to-TBOX mapping with:")
-print("- Complete coverage of core entities (Papers, Authors, Topics)")
-print("- Full relationship mapping (authorship, citations, reviews, topics)")
-print("- Proper datatype properties (titles, abstracts, names, years)")
-print("- Review system implementation with generated Review instances")
-print("- Inference-ready structure for subclass relationships") 
\ No newline at end of file
+if __name__ == "__main__":
+    main()